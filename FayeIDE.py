@@ -1,74 +1,791 @@
+import time
+STARTUP_STARTED = time.perf_counter()
+
 import enum
 from typing import Callable
 from PySide6.QtWidgets import (QApplication, QMainWindow, QPlainTextEdit, QDockWidget,
                                  QMenuBar, QMenu, QFileDialog, QMessageBox, QVBoxLayout,
                                  QWidget, QLabel, QPushButton, QHBoxLayout, QLineEdit,
                                  QDialog, QStatusBar, QTabWidget, QCompleter, QListWidget,
-                                 QTreeView, QFileSystemModel, QCheckBox)
-from PySide6.QtCore import Qt, QSize, QStringListModel, QProcess, QDir
-from PySide6.QtGui import QTextCharFormat, QSyntaxHighlighter, QColor, QFont, QTextCursor, QPainter, QTextDocument
+                                 QTreeView, QFileSystemModel, QCheckBox, QListWidgetItem, QTreeWidget,
+                                 QTreeWidgetItem, QTextEdit, QToolTip, QSpinBox)
+from PySide6.QtCore import (Qt, QSize, QStringListModel, QProcess, QDir, QTimer, QThread, Signal, QObject,
+                            QThreadPool, QRegularExpression, QFileSystemWatcher, QEvent)
+from PySide6.QtNetwork import QLocalServer
+from PySide6.QtGui import (QTextCharFormat, QSyntaxHighlighter, QColor, QFont, QTextCursor, QPainter, QTextDocument,
+                           QTextLayout)
 import sys
+import ast
+import builtins
+import codecs
+import difflib
+import fnmatch
+import hashlib
+import heapq
+import json
+import sqlite3
 import subprocess
 import re
 import os
+import pstats
+import shutil
+import signal
+import tempfile
+import zlib
+from array import array
+import threading
+import queue
 import logging
+import atexit
+import warnings
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import accumulate, chain, islice
+from collections import deque, OrderedDict
 from datetime import datetime
-import jedi
+
+class DeferredQueueHandler(QueueHandler):
+    def prepare(self, record):
+        return record
+
+class StartupBufferHandler(logging.Handler):
+    def __init__(self, capacity):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.target = None
+
+    def emit(self, record):
+        if self.target is not None:
+            self.target.handle(record)
+        else:
+            self.records.append(record)
+
+    def flush_to(self, target):
+        with self.lock:
+            self.target = target
+            for record in self.records:
+                target.handle(record)
+            self.records.clear()
 
 class LogManager:
-    def __init__(self):
-        if not os.path.exists('logs'):
-            os.makedirs('logs')
-            
-        log_file = f'logs/faye_ide_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
-        
+    LEVELS = {
+        'debug': logging.DEBUG,
+        'info': logging.INFO,
+        'warning': logging.WARNING,
+        'error': logging.ERROR,
+        'critical': logging.CRITICAL
+    }
+    MAX_BYTES = 5 * 1024 * 1024
+    BACKUP_COUNT = 3
+    SUMMARY_INTERVAL = 5.0
+    STARTUP_BUFFER = 10000
+
+    def __init__(self, level: str = None):
         self.logger = logging.getLogger('FayeIDE')
-        self.logger.setLevel(logging.DEBUG)
+        level = (level or os.environ.get('FAYE_IDE_LOG_LEVEL', 'debug')).lower()
+        self.logger.setLevel(self.LEVELS.get(level, logging.DEBUG))
+        self.logger.propagate = False
         
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
+        self.console_handler = logging.StreamHandler()
+        self.console_handler.setLevel(logging.INFO)
         
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self.formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        self.console_handler.setFormatter(self.formatter)
+        self.file_handler = None
+        self.buffer_handler = StartupBufferHandler(self.STARTUP_BUFFER)
+
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, self.buffer_handler, self.console_handler,
+                                      respect_handler_level=True)
+        self.logger.addHandler(DeferredQueueHandler(self.queue))
+        self.listener.start()
+        self.running = True
+
+        self.counters = {}
+        self.counters_lock = threading.Lock()
+        self.last_summary = time.monotonic()
+        atexit.register(self.stop)
+        if level not in self.LEVELS:
+            self.log('warning', f'Unknown log level {level!r}, using debug')
     
-    def log(self, level: str, message: str):
-        if level == 'debug':
-            self.logger.debug(message)
-        elif level == 'info':
-            self.logger.info(message)
-        elif level == 'warning':
-            self.logger.warning(message)
-        elif level == 'error':
-            self.logger.error(message)
-        elif level == 'critical':
-            self.logger.critical(message)
+    def start_file_logging(self):
+        if self.file_handler is not None:
+            return
+        os.makedirs('logs', exist_ok=True)
+        log_file = f'logs/faye_ide_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+        self.file_handler = RotatingFileHandler(log_file, maxBytes=self.MAX_BYTES,
+                                                backupCount=self.BACKUP_COUNT, encoding='utf-8')
+        self.file_handler.setLevel(logging.DEBUG)
+        self.file_handler.setFormatter(self.formatter)
+        self.buffer_handler.flush_to(self.file_handler)
+        self.listener.handlers = (self.file_handler, self.console_handler)
+
+    def log(self, level: str, message: str, *args):
+        level_number = self.LEVELS.get(level)
+        if level_number is not None and self.logger.isEnabledFor(level_number):
+            self.logger.log(level_number, message, *args)
+
+    def count(self, event: str, source: str):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        key = (event, source)
+        with self.counters_lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+        if time.monotonic() - self.last_summary >= self.SUMMARY_INTERVAL:
+            self.flush_counts()
+
+    def flush_counts(self):
+        with self.counters_lock:
+            counters, self.counters = self.counters, {}
+            elapsed = time.monotonic() - self.last_summary
+            self.last_summary = time.monotonic()
+        if counters:
+            summary = ', '.join(f'{count} x {event} ({source})' for (event, source), count in counters.items())
+            self.logger.debug('Activity in the last %.1fs: %s', elapsed, summary)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.flush_counts()
+        self.listener.stop()
 
 log_manager = LogManager()
 
+IGNORED_DIRS = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', 'venv', '.venv', 'env',
+                '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.ruff_cache', 'build', 'dist'}
+
+def translate_ignore_pattern(pattern):
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    parts = ['' if anchored else '(?:.*/)?']
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith('**/', index) and (index == 0 or pattern[index - 1] == '/'):
+            parts.append('(?:.*/)?')
+            index += 3
+        elif pattern.startswith('**', index):
+            parts.append('.*')
+            index += 2
+        elif pattern[index] == '*':
+            parts.append('[^/]*')
+            index += 1
+        elif pattern[index] == '?':
+            parts.append('[^/]')
+            index += 1
+        elif pattern[index] == '[' and ']' in pattern[index + 2:]:
+            end = pattern.index(']', index + 2)
+            body = pattern[index + 1:end]
+            parts.append('[' + ('^' + body[1:] if body.startswith('!') else body).replace('\\', '\\\\') + ']')
+            index = end + 1
+        else:
+            if pattern[index] == '\\' and index + 1 < len(pattern):
+                index += 1
+            parts.append(re.escape(pattern[index]))
+            index += 1
+    return re.compile(''.join(parts) + '$')
+
+def load_ignore_patterns(root):
+    patterns = []
+    try:
+        with open(os.path.join(root, '.gitignore'), 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.rstrip('\n').rstrip()
+                if not line or line.startswith('#'):
+                    continue
+                negated = line.startswith('!')
+                line = line[1:] if negated else line
+                directory_only = line.endswith('/')
+                line = line.rstrip('/')
+                if line:
+                    patterns.append((translate_ignore_pattern(line), negated, directory_only))
+    except OSError:
+        pass
+    return patterns
+
+def is_ignored(relative_path, is_directory, ignore_patterns):
+    ignored = False
+    for pattern, negated, directory_only in ignore_patterns:
+        if ignored == negated and (is_directory or not directory_only) and pattern.match(relative_path):
+            ignored = not negated
+    return ignored
+
+def iter_workspace_files(root, extensions=None, ignore_patterns=None):
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                is_directory = entry.is_dir(follow_symlinks=False)
+                relative_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                if ignore_patterns and is_ignored(relative_path, is_directory, ignore_patterns):
+                    continue
+                if is_directory:
+                    if entry.name not in IGNORED_DIRS and not entry.name.startswith('.'):
+                        stack.append(entry.path)
+                elif extensions is None or entry.name.endswith(extensions):
+                    yield entry.path, entry.stat()
+            except OSError:
+                continue
+
+def character_mask(text):
+    mask = 0
+    for character in set(text):
+        mask |= 1 << (ord(character) & 63)
+    return mask
+
+def build_search_pattern(text, case_sensitive=False, whole_words=False, use_regex=False):
+    source = text if use_regex else re.escape(text)
+    if whole_words:
+        source = rf'\b(?:{source})\b'
+    return re.compile(source, 0 if case_sensitive else re.IGNORECASE)
+
+ASTRAL_CHARACTER = re.compile('[\U00010000-\U0010FFFF]')
+
+def utf16_position_mapper(text):
+    astral_positions = [match.start() for match in ASTRAL_CHARACTER.finditer(text)]
+    if not astral_positions:
+        return lambda position: position
+    return lambda position: position + bisect_left(astral_positions, position)
+
+def utf16_length(text):
+    return len(text) + sum(1 for _ in ASTRAL_CHARACTER.finditer(text))
+
+def utf16_to_index(text, offset):
+    if not ASTRAL_CHARACTER.search(text):
+        return offset
+    return len(text.encode('utf-16-le')[:offset * 2].decode('utf-16-le', 'ignore'))
+
+TRIGRAM = re.compile(r'(?=([^\n]{3}))')
+
+def chunk_trigrams(text):
+    return set(TRIGRAM.findall('\n'.join(set(text.lower().split('\n')))))
+
+def index_chunks(first_index, chunks):
+    bitmaps = {}
+    size = (len(chunks) + 7) // 8
+    for index, chunk in enumerate(chunks):
+        byte, bit = index >> 3, 1 << (index & 7)
+        for trigram in chunk_trigrams(chunk):
+            bitmap = bitmaps.get(trigram)
+            if bitmap is None:
+                bitmap = bitmaps[trigram] = bytearray(size)
+            bitmap[byte] |= bit
+    return {trigram: int.from_bytes(bitmap, 'little') << first_index for trigram, bitmap in bitmaps.items()}
+
+def iter_bits(mask):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+def iter_bits_reversed(mask):
+    while mask:
+        index = mask.bit_length() - 1
+        yield index
+        mask ^= 1 << index
+
+def compute_replacements(text, pattern, replacement, use_regex=False, merge_gap=256):
+    edits = []
+    count = 0
+    hunk_start = hunk_end = None
+    pieces = []
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        new_text = match.expand(replacement) if use_regex else replacement
+        count += 1
+        if new_text == match.group():
+            continue
+        if hunk_start is not None and start - hunk_end <= merge_gap:
+            pieces.append(text[hunk_end:start])
+            pieces.append(new_text)
+            hunk_end = end
+            continue
+        if hunk_start is not None:
+            edits.append((hunk_start, hunk_end, ''.join(pieces)))
+        hunk_start, hunk_end, pieces = start, end, [new_text]
+    if hunk_start is not None:
+        edits.append((hunk_start, hunk_end, ''.join(pieces)))
+    return edits, count
+
+def apply_text_edits(document, text, edits):
+    if not edits:
+        return
+    to_utf16 = utf16_position_mapper(text)
+    cursor = QTextCursor(document)
+    for index, (start, end, new_text) in enumerate(sorted(edits, reverse=True)):
+        # a separate joined block per edit keeps one undo step while each hunk emits its own contentsChange
+        if index:
+            cursor.joinPreviousEditBlock()
+        else:
+            cursor.beginEditBlock()
+        cursor.setPosition(to_utf16(start))
+        cursor.setPosition(to_utf16(end), QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(new_text)
+        cursor.endEditBlock()
+
+MAX_DIFF_LINES = 200000
+
+def split_lines(text):
+    lines = text.split('\n')
+    return [line + '\n' for line in lines[:-1]] + [lines[-1]]
+
+def diff_text_edits(old_text, new_text):
+    if old_text == new_text:
+        return []
+    old_lines, new_lines = split_lines(old_text), split_lines(new_text)
+    limit = min(len(old_lines), len(new_lines))
+    prefix = 0
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+    old_middle = old_lines[prefix:len(old_lines) - suffix]
+    new_middle = new_lines[prefix:len(new_lines) - suffix]
+    offsets = list(accumulate(map(len, old_middle), initial=sum(map(len, old_lines[:prefix]))))
+    if len(old_middle) + len(new_middle) > MAX_DIFF_LINES:
+        return [(offsets[0], offsets[-1], ''.join(new_middle))]
+    matcher = difflib.SequenceMatcher(None, old_middle, new_middle, autojunk=False)
+    return [(offsets[i1], offsets[i2], ''.join(new_middle[j1:j2]))
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+def file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def search_files(file_paths, pattern_source, pattern_flags, max_matches=1000):
+    pattern = re.compile(pattern_source, pattern_flags)
+    results = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            continue
+        if b'\0' in data[:8192]:
+            continue
+        text = data.decode('utf-8', errors='replace')
+        if pattern.search(text) is None:
+            continue
+        matches = []
+        for line_number, line in enumerate(text.splitlines(), 1):
+            for match in pattern.finditer(line):
+                matches.append((line_number, match.start(), match.end(), line[:300]))
+                if len(matches) >= max_matches:
+                    break
+            if len(matches) >= max_matches:
+                break
+        if matches:
+            results.append((file_path, matches))
+    return results
+
+def extract_symbols(file_path):
+    try:
+        with open(file_path, 'rb') as file:
+            tree = ast.parse(file.read(), filename=file_path)
+    except (SyntaxError, ValueError, OSError):
+        return file_path, []
+
+    symbols = []
+
+    def visit(node, container, in_function):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                symbols.append((child.name, 'class', child.lineno, child.col_offset, container))
+                visit(child, f'{container}.{child.name}' if container else child.name, False)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = 'method' if container and not in_function else 'function'
+                symbols.append((child.name, kind, child.lineno, child.col_offset, container))
+                visit(child, f'{container}.{child.name}' if container else child.name, True)
+            elif isinstance(child, (ast.Assign, ast.AnnAssign)):
+                if in_function:
+                    continue
+                targets = child.targets if isinstance(child, ast.Assign) else [child.target]
+                for target in targets:
+                    for name in ast.walk(target):
+                        if isinstance(name, ast.Name):
+                            symbols.append((name.id, 'variable', name.lineno, name.col_offset, container))
+            elif isinstance(child, (ast.If, ast.Try, ast.With, ast.For, ast.While)):
+                visit(child, container, in_function)
+
+    visit(tree, '', False)
+    return file_path, symbols
+
+IMPLICIT_NAMES = frozenset(dir(builtins)) | {
+    '__file__', '__name__', '__doc__', '__builtins__', '__spec__', '__loader__', '__package__',
+    '__path__', '__annotations__', '__cached__', '__module__', '__qualname__', '__class__',
+}
+MAX_DIAGNOSTICS = 1000
+
+class NameScope:
+    def __init__(self, kind, parent=None):
+        self.kind = kind
+        self.parent = parent
+        self.bindings = set()
+        self.imports = {}
+        self.used = set()
+        self.loads = []
+        self.globals = set()
+        self.nonlocals = set()
+
+def check_names(tree):
+    module = NameScope('module')
+    scopes = [module]
+    star_imports = []
+
+    def new_scope(kind, parent):
+        scope = NameScope(kind, parent)
+        scopes.append(scope)
+        return scope
+
+    def bind(scope, name, node=None, imported=None):
+        if name in scope.globals:
+            scope = module
+        elif name in scope.nonlocals:
+            return
+        scope.bindings.add(name)
+        if imported:
+            scope.imports[name] = (node, imported)
+        else:
+            scope.imports.pop(name, None)
+
+    def visit_annotation(node, scope):
+        visit(node, scope)
+        if any(isinstance(child, ast.Name) and child.id == 'Literal' or
+               isinstance(child, ast.Attribute) and child.attr == 'Literal' for child in ast.walk(node)):
+            return
+        for child in ast.walk(node):
+            if isinstance(child, ast.Constant) and isinstance(child.value, str):
+                try:
+                    parsed = ast.parse(child.value.strip(), mode='eval').body
+                except SyntaxError:
+                    continue
+                for name in ast.walk(parsed):
+                    ast.copy_location(name, child)
+                visit(parsed, scope)
+
+    def visit_function(node, scope):
+        for decorator in getattr(node, 'decorator_list', ()):
+            visit(decorator, scope)
+        inner = new_scope('function', scope)
+        for parameter in getattr(node, 'type_params', ()):
+            bind(inner, parameter.name)
+        annotation_scope = inner if getattr(node, 'type_params', None) else scope
+        arguments = node.args
+        for default in arguments.defaults + [default for default in arguments.kw_defaults if default]:
+            visit(default, scope)
+        for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs + [arguments.vararg,
+                                                                                         arguments.kwarg]:
+            if argument is None:
+                continue
+            if argument.annotation:
+                visit_annotation(argument.annotation, annotation_scope)
+            bind(inner, argument.arg)
+        if getattr(node, 'returns', None):
+            visit_annotation(node.returns, annotation_scope)
+        for statement in node.body if isinstance(node.body, list) else [node.body]:
+            visit(statement, inner)
+        if not isinstance(node, ast.Lambda):
+            bind(scope, node.name)
+
+    def visit(node, scope):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            visit_function(node, scope)
+        elif isinstance(node, ast.ClassDef):
+            for decorator in node.decorator_list:
+                visit(decorator, scope)
+            inner = new_scope('class', scope)
+            for parameter in getattr(node, 'type_params', ()):
+                bind(inner, parameter.name)
+            for base in node.bases + [keyword.value for keyword in node.keywords]:
+                visit(base, inner if getattr(node, 'type_params', None) else scope)
+            for statement in node.body:
+                visit(statement, inner)
+            bind(scope, node.name)
+        elif isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)):
+            visit(node.generators[0].iter, scope)
+            inner = new_scope('comprehension', scope)
+            for index, generator in enumerate(node.generators):
+                if index:
+                    visit(generator.iter, inner)
+                visit(generator.target, inner)
+                for condition in generator.ifs:
+                    visit(condition, inner)
+            for element in (node.key, node.value) if isinstance(node, ast.DictComp) else (node.elt,):
+                visit(element, inner)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                location = alias if hasattr(alias, 'lineno') else node
+                bind(scope, alias.asname or alias.name.partition('.')[0], location, alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module == '__future__':
+                return
+            for alias in node.names:
+                if alias.name == '*':
+                    star_imports.append(node)
+                else:
+                    module_name = f"{'.' * node.level}{node.module + '.' if node.module else ''}"
+                    location = alias if hasattr(alias, 'lineno') else node
+                    bind(scope, alias.asname or alias.name, location, module_name + alias.name)
+        elif isinstance(node, ast.Global):
+            scope.globals.update(node.names)
+        elif isinstance(node, ast.Nonlocal):
+            scope.nonlocals.update(node.names)
+        elif isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Store):
+                bind(scope, node.id)
+            else:
+                scope.loads.append(node)
+        elif isinstance(node, ast.NamedExpr):
+            target_scope = scope
+            while target_scope.kind == 'comprehension':
+                target_scope = target_scope.parent
+            bind(target_scope, node.target.id)
+            visit(node.value, scope)
+        elif isinstance(node, ast.AnnAssign):
+            visit_annotation(node.annotation, scope)
+            visit(node.target, scope)
+            if node.value:
+                visit(node.value, scope)
+        elif isinstance(node, getattr(ast, 'TypeAlias', ())):
+            bind(scope, node.name.id)
+            inner = new_scope('function', scope)
+            for parameter in node.type_params:
+                bind(inner, parameter.name)
+            visit(node.value, inner)
+        else:
+            name = getattr(node, 'name', None) or getattr(node, 'rest', None)
+            if isinstance(name, str) and isinstance(node, (ast.ExceptHandler, getattr(ast, 'MatchAs', ()),
+                                                           getattr(ast, 'MatchStar', ()),
+                                                           getattr(ast, 'MatchMapping', ()))):
+                bind(scope, name)
+            for child in ast.iter_child_nodes(node):
+                visit(child, scope)
+
+    for statement in tree.body:
+        visit(statement, module)
+
+    exported = set()
+    for statement in tree.body:
+        if (isinstance(statement, (ast.Assign, ast.AugAssign)) and isinstance(statement.value, (ast.List, ast.Tuple))
+                and any(isinstance(target, ast.Name) and target.id == '__all__'
+                        for target in getattr(statement, 'targets', [getattr(statement, 'target', None)]))):
+            exported.update(element.value for element in statement.value.elts
+                            if isinstance(element, ast.Constant) and isinstance(element.value, str))
+    module.used.update(exported)
+
+    undefined = []
+    for scope in scopes:
+        for node in scope.loads:
+            current = module if node.id in scope.globals else scope
+            while current is not None:
+                if (current is scope or current.kind != 'class') and node.id in current.bindings:
+                    current.used.add(node.id)
+                    break
+                current = current.parent
+            else:
+                if node.id not in IMPLICIT_NAMES and not star_imports:
+                    undefined.append(node)
+
+    unused = [(node, imported) for scope in scopes for name, (node, imported) in scope.imports.items()
+              if name not in scope.used]
+    return undefined, unused
+
+OUTLINE_SEGMENT_START = re.compile(r'(?:@|(?:async\s+)?def\s|class\s)')
+OUTLINE_HEADER = re.compile(r'([ \t]*)(?:async\s+)?(def|class)\s+(\w+)')
+
+def split_top_level(lines):
+    segments = []
+    start = 0
+    decorated = False
+    for number, line in enumerate(lines):
+        if not OUTLINE_SEGMENT_START.match(line):
+            continue
+        if line.startswith('@'):
+            split = not decorated
+            decorated = True
+        else:
+            split = not decorated
+            decorated = False
+        if split and number > start:
+            segments.append((start, '\n'.join(lines[start:number])))
+            start = number
+    segments.append((start, '\n'.join(lines[start:])))
+    return segments
+
+def outline_from_tree(tree):
+    symbols = []
+
+    def visit(node, depth, in_class):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                symbols.append((child.lineno, child.end_lineno, depth, 'class', child.name))
+                visit(child, depth + 1, True)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = 'method' if in_class else 'function'
+                symbols.append((child.lineno, child.end_lineno, depth, kind, child.name))
+                visit(child, depth + 1, False)
+            elif isinstance(child, (ast.If, ast.Try, ast.With, ast.For, ast.While)):
+                visit(child, depth, in_class)
+
+    visit(tree, 0, False)
+    return symbols
+
+def outline_from_headers(lines):
+    symbols = []
+    stack = []
+    for number, line in enumerate(lines, 1):
+        match = OUTLINE_HEADER.match(line)
+        if not match:
+            continue
+        indent = len(match.group(1).expandtabs())
+        while stack and stack[-1][0] >= indent:
+            symbols[stack.pop()[1]][1] = number - 1
+        in_class = bool(stack) and symbols[stack[-1][1]][3] == 'class'
+        kind = 'class' if match.group(2) == 'class' else 'method' if in_class else 'function'
+        symbols.append([number, len(lines), len(stack), kind, match.group(3)])
+        stack.append((indent, len(symbols) - 1))
+    return [tuple(symbol) for symbol in symbols]
+
+def outline_segment(text):
+    try:
+        return outline_from_tree(ast.parse(text)), True
+    except (SyntaxError, ValueError, RecursionError):
+        return outline_from_headers(text.split('\n')), False
+
+def character_column(line_text, byte_offset):
+    if line_text.isascii():
+        return byte_offset
+    return len(line_text.encode('utf-8')[:byte_offset].decode('utf-8', 'ignore'))
+
+def analyze_source(source, filename='<untitled>'):
+    lines = source.split('\n')
+    diagnostics = []
+
+    def line_text(line):
+        return lines[line - 1] if 0 < line <= len(lines) else ''
+
+    def add_node(node, severity, message, length=None):
+        text = line_text(node.lineno)
+        column = character_column(text, node.col_offset)
+        if length is None:
+            end_line = getattr(node, 'end_lineno', node.lineno)
+            end = character_column(text, node.end_col_offset) if end_line == node.lineno else len(text)
+        else:
+            end = column + length
+        diagnostics.append((node.lineno, column, max(end, column + 1), severity, message))
+
+    def add_syntax_error(error, severity):
+        line = error.lineno or 1
+        text = line_text(line)
+        column = min(max((error.offset or 1) - 1, 0), len(text))
+        end_offset = getattr(error, 'end_offset', None)
+        end_line = getattr(error, 'end_lineno', None)
+        end = end_offset - 1 if end_offset and end_line == line and end_offset - 1 > column else column + 1
+        if column >= len(text) and column:
+            column -= 1
+        diagnostics.append((line, column, max(end, column + 1), severity, error.msg))
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        try:
+            tree = ast.parse(source, filename)
+            compile(tree, filename, 'exec', dont_inherit=True)
+        except SyntaxError as e:
+            add_syntax_error(e, 'error')
+            return diagnostics
+        except (ValueError, RecursionError, MemoryError) as e:
+            diagnostics.append((1, 0, 1, 'error', str(e)))
+            return diagnostics
+    for warning in caught:
+        if issubclass(warning.category, (SyntaxWarning, DeprecationWarning)) and warning.filename == filename:
+            text = line_text(warning.lineno)
+            column = len(text) - len(text.lstrip())
+            diagnostics.append((warning.lineno, column, max(len(text), column + 1), 'warning', str(warning.message)))
+
+    try:
+        undefined, unused = check_names(tree)
+    except RecursionError:
+        return diagnostics
+    for node in undefined:
+        add_node(node, 'error', f"undefined name '{node.id}'", len(node.id))
+    for node, imported in unused:
+        add_node(node, 'warning', f"'{imported}' imported but unused")
+
+    diagnostics = sorted({diagnostic for diagnostic in diagnostics if '# noqa' not in line_text(diagnostic[0])})
+    return diagnostics[:MAX_DIAGNOSTICS]
+
 class PythonHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent=None):
+    ENGINES = ('scanner', 'rules')
+
+    # Block state: 0 means no open string, otherwise the low 3 bits hold the
+    # index of the open quote in QUOTES (plus one) and the next bits the prefix.
+    QUOTES = ('"""', "'''", '"', "'")
+    QUOTE_MASK = 0x07
+    PREFIX_FLAGS = {'r': 0x08, 'b': 0x10, 'f': 0x20, 'u': 0}
+
+    VISIBLE_BLOCKS = 100
+    SYNC_BLOCK_BUDGET = 300
+    IDLE_BLOCK_BUDGET = 2000
+
+    tables = {}
+
+    def __init__(self, parent=None, engine: str = 'scanner', lazy: bool = True):
         super().__init__(parent)
-        self.highlighting_rules = []
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown highlighting engine: {engine}")
+        self.engine = engine
+        self.lazy = lazy
 
+        self.visible_blocks = (0, self.VISIBLE_BLOCKS)
+        self.dirty_ranges = []
+        self.growing_range = None
+        self.last_block = -1
+        self.budget = self.SYNC_BLOCK_BUDGET
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(0)
+        self.idle_timer.timeout.connect(self.process_deferred)
+
+        tables = self.shared_tables(engine)
+        self.formats = tables['formats']
+        self.string_pattern = tables['string_pattern']
+        self.string_closers = tables['string_closers']
+        self.highlighting_rules = tables['highlighting_rules']
+        self.word_kinds = tables.get('word_kinds')
+        self.token_pattern = tables.get('token_pattern')
+        self.comment_format = self.formats['comment']
+
+    @classmethod
+    def shared_tables(cls, engine):
+        if engine not in cls.tables:
+            cls.tables[engine] = cls.build_tables(engine)
+        return cls.tables[engine]
+
+    @classmethod
+    def build_tables(cls, engine):
         formats = {
-            'keyword': self.create_format("#569CD6", bold=True),
-            'class': self.create_format("#4EC9B0", bold=True),
-            'function': self.create_format("#DCDCAA"),
-            'string': self.create_format("#CE9178"),
-            'comment': self.create_format("#6A9955", italic=True),
-            'numbers': self.create_format("#B5CEA8"),
-            'operators': self.create_format("#D4D4D4"),
-            'braces': self.create_format("#D4D4D4"),
-            'decorators': self.create_format("#569CD6"),
-            'constants': self.create_format("#4FC1FF"),
-            'builtins': self.create_format("#4EC9B0")
+            'keyword': cls.create_format("#569CD6", bold=True),
+            'class': cls.create_format("#4EC9B0", bold=True),
+            'function': cls.create_format("#DCDCAA"),
+            'string': cls.create_format("#CE9178"),
+            'comment': cls.create_format("#6A9955", italic=True),
+            'numbers': cls.create_format("#B5CEA8"),
+            'operators': cls.create_format("#D4D4D4"),
+            'braces': cls.create_format("#D4D4D4"),
+            'decorators': cls.create_format("#569CD6"),
+            'constants': cls.create_format("#4FC1FF"),
+            'builtins': cls.create_format("#4EC9B0")
         }
 
         keywords = [
@@ -78,8 +795,6 @@ class PythonHighlighter(QSyntaxHighlighter):
             'nonlocal', 'not', 'or', 'pass', 'raise', 'return', 'True', 'try',
             'while', 'with', 'yield'
         ]
-        self.add_rules(keywords, formats['keyword'])
-
         builtins = [
             'abs', 'all', 'any', 'ascii', 'bin', 'bool', 'bytearray', 'bytes',
             'chr', 'classmethod', 'compile', 'complex', 'delattr', 'dict', 'dir',
@@ -91,42 +806,73 @@ class PythonHighlighter(QSyntaxHighlighter):
             'reversed', 'round', 'set', 'setattr', 'slice', 'sorted', 'staticmethod',
             'str', 'sum', 'super', 'tuple', 'type', 'vars', 'zip'
         ]
-        self.add_rules(builtins, formats['builtins'])
 
-        operators = [
-            '=', '==', '!=', '<', '<=', '>', '>=', r'\+', '-', r'\*', '/',
-            '//', r'\%', r'\*\*', r'\+=', '-=', r'\*=', '/=', r'\%=', r'\^',
-            r'\|', r'\&', r'\~', '>>', '<<'
-        ]
-        self.add_rules(operators, formats['operators'])
+        string_tokens = (
+            r'(?P<comment>#.*)'
+            r'|(?P<triple>(?P<triple_prefix>[rRbBfFuU]{0,2})(?P<triple_quote>"""|\'\'\'))'
+            r'|(?P<string>[rRbBfFuU]{0,2}(?:"[^"\\]*(?:\\.[^"\\]*)*"'
+            r"|'[^'\\]*(?:\\.[^'\\]*)*'))"
+            r'|(?P<open>(?P<open_prefix>[rRbBfFuU]{0,2})(?P<open_quote>["\']))'
+        )
+        tables = {
+            'formats': formats,
+            'string_pattern': re.compile(string_tokens),
+            'string_closers': {
+                quote: re.compile(r'(?:\\.|[^\\])*?' + re.escape(quote))
+                for quote in cls.QUOTES
+            },
+            'highlighting_rules': [],
+        }
+
+        if engine == 'scanner':
+            tables['word_kinds'] = dict.fromkeys(builtins, 'builtins')
+            tables['word_kinds'].update(dict.fromkeys(keywords, 'keyword'))
+            tables['token_pattern'] = re.compile(
+                string_tokens +
+                r'|(?P<decorators>@\w+)'
+                r'|(?P<numbers>\b[0-9]+\b)'
+                r'|(?P<word>[^\W\d]\w*)'
+                r'|(?P<operators>[-=!<>+*/%^|&~]+)'
+                r'|(?P<braces>[{}()\[\],:;]+)'
+            )
+        else:
+            rules = tables['highlighting_rules']
+            cls.add_rules(rules, keywords, formats['keyword'])
+            cls.add_rules(rules, builtins, formats['builtins'])
 
-        braces = [r'\{', r'\}', r'\(', r'\)', r'\[', r'\]', ',', ':', ';']
-        self.add_rules(braces, formats['braces'])
+            operators = [
+                '=', '==', '!=', '<', '<=', '>', '>=', r'\+', '-', r'\*', '/',
+                '//', r'\%', r'\*\*', r'\+=', '-=', r'\*=', '/=', r'\%=', r'\^',
+                r'\|', r'\&', r'\~', '>>', '<<'
+            ]
+            cls.add_rules(rules, operators, formats['operators'])
 
-        self.highlighting_rules.append(
-            (re.compile(r'\b[0-9]+\b'), formats['numbers'])
-        )
+            braces = [r'\{', r'\}', r'\(', r'\)', r'\[', r'\]', ',', ':', ';']
+            cls.add_rules(rules, braces, formats['braces'])
 
-        self.highlighting_rules.append(
-            (re.compile(r'@\w+'), formats['decorators'])
-        )
+            rules.append(
+                (re.compile(r'\b[0-9]+\b'), formats['numbers'])
+            )
 
-        self.highlighting_rules.extend([
-            (re.compile(r'""".*?"""', re.DOTALL), formats['string']),
-            (re.compile(r"'''.*?'''", re.DOTALL), formats['string']),
-            (re.compile(r'"[^"\\]*(\\.[^"\\]*)*"'), formats['string']),
-            (re.compile(r"'[^'\\]*(\\.[^'\\]*)*'"), formats['string'])
-        ])
+            rules.append(
+                (re.compile(r'@\w+'), formats['decorators'])
+            )
 
-        self.highlighting_rules.append(
-            (re.compile(r'#.*'), formats['comment'])
-        )
+            rules.extend([
+                (re.compile(r'""".*?"""', re.DOTALL), formats['string']),
+                (re.compile(r"'''.*?'''", re.DOTALL), formats['string']),
+                (re.compile(r'"[^"\\]*(\\.[^"\\]*)*"'), formats['string']),
+                (re.compile(r"'[^'\\]*(\\.[^'\\]*)*'"), formats['string'])
+            ])
 
-        self.comment_start = re.compile(r'"""(?!.*""")')
-        self.comment_end = re.compile(r'.*?"""')
-        self.comment_format = formats['comment']
+            rules.append(
+                (re.compile(r'#.*'), formats['comment'])
+            )
 
-    def create_format(self, color: str, bold: bool = False, italic: bool = False) -> QTextCharFormat:
+        return tables
+
+    @staticmethod
+    def create_format(color: str, bold: bool = False, italic: bool = False) -> QTextCharFormat:
         text_format = QTextCharFormat()
         text_format.setForeground(QColor(color))
         if bold:
@@ -135,43 +881,485 @@ class PythonHighlighter(QSyntaxHighlighter):
             text_format.setFontItalic(True)
         return text_format
 
-    def add_rules(self, words: list[str], format):
+    @staticmethod
+    def add_rules(rules, words: list[str], format):
         for word in words:
             pattern = f"\\b{word}\\b"
-            self.highlighting_rules.append((re.compile(pattern), format))
+            rules.append((re.compile(pattern), format))
 
-    def highlightBlock(self, text):
-        self.setFormat(0, len(text), QTextCharFormat())
+    def highlight_rules(self, text, pos, set_format):
+        set_format(pos, len(text) - pos, QTextCharFormat())
 
         for pattern, format in self.highlighting_rules:
-            for match in pattern.finditer(text):
-                self.setFormat(match.start(), match.end() - match.start(), format)
-
-        self.setCurrentBlockState(0)
-        if self.previousBlockState() == 1:
-            end_match = self.comment_end.match(text)
-            if end_match:
-                comment_length = end_match.end()
-                self.setFormat(0, comment_length, self.comment_format)
-                self.setCurrentBlockState(0)
+            for match in pattern.finditer(text, pos):
+                set_format(match.start(), match.end() - match.start(), format)
+
+        return self.scan(text, pos, self.string_pattern, set_format, False)
+
+    def encode_state(self, quote: str, prefix: str) -> int:
+        state = self.QUOTES.index(quote) + 1
+        for char in prefix.lower():
+            state |= self.PREFIX_FLAGS[char]
+        return state
+
+    def close_string(self, text, pos, quote):
+        match = self.string_closers[quote].match(text, pos)
+        if match:
+            return match.end(), False
+        if len(quote) == 3:
+            return len(text), True
+        trailing = len(text) - len(text.rstrip('\\'))
+        return len(text), trailing % 2 == 1
+
+    def scan(self, text, pos, pattern, set_format, emit_tokens=True):
+        word_kinds = self.word_kinds if emit_tokens else None
+        formats = self.formats
+        run_kind = None
+        run_start = run_end = 0
+        state = 0
+        search = pattern.search
+
+        while True:
+            match = search(text, pos)
+            if match is None:
+                break
+            kind = match.lastgroup
+            start, pos = match.span()
+            if kind == 'word':
+                kind = word_kinds.get(match.group())
+                if kind is None:
+                    continue
+            elif kind == 'triple' or kind == 'open':
+                quote = match.group(kind + '_quote')
+                pos, is_open = self.close_string(text, pos, quote)
+                if is_open:
+                    state = self.encode_state(quote, match.group(kind + '_prefix'))
+                    kind = 'comment' if kind == 'triple' else 'string'
+                elif not emit_tokens:
+                    continue
+                else:
+                    kind = 'string'
+            elif not emit_tokens:
+                continue
+            if kind == run_kind and (run_end == start or text[run_end:start].isspace()):
+                run_end = pos
+            else:
+                if run_kind is not None:
+                    set_format(run_start, run_end - run_start, formats[run_kind])
+                run_kind, run_start, run_end = kind, start, pos
+            if state:
+                break
+
+        if run_kind is not None:
+            set_format(run_start, run_end - run_start, formats[run_kind])
+        return state
+
+    def highlightBlock(self, text):
+        block = self.currentBlock()
+        block_number = block.blockNumber()
+        if self.lazy:
+            first, last = self.visible_blocks
+            if not first <= block_number <= last:
+                if self.budget <= 0:
+                    growing = self.growing_range
+                    if growing is not None and growing[1] + 1 == block_number:
+                        growing[1] = block_number
+                    else:
+                        self.defer_block(block_number)
+                    self.setCurrentBlockState(block.userState())
+                    return
+                self.budget -= 1
+                if not self.idle_timer.isActive():
+                    self.idle_timer.start()
+        self.last_block = block_number
+        self.setCurrentBlockState(self.highlight_text(text, self.previousBlockState(), self.setFormat))
+
+    def highlight_text(self, text, previous_state, set_format) -> int:
+        pos = 0
+        if previous_state > 0:
+            quote = self.QUOTES[(previous_state & self.QUOTE_MASK) - 1]
+            pos, is_open = self.close_string(text, 0, quote)
+            set_format(0, pos, self.comment_format if len(quote) == 3 else self.formats['string'])
+            if is_open:
+                return previous_state
+
+        if self.engine == 'scanner':
+            return self.scan(text, pos, self.token_pattern, set_format)
+        return self.highlight_rules(text, pos, set_format)
+
+    def highlight_layouts(self, block, last_block_number: int):
+        document = block.document()
+        previous = block.previous()
+        state = max(previous.userState(), 0) if previous.isValid() else 0
+        start = end = block.position()
+
+        while block.isValid() and block.blockNumber() <= last_block_number:
+            if block.userState() < 0:
+                ranges = []
+
+                def set_format(format_start, length, format):
+                    format_range = QTextLayout.FormatRange()
+                    format_range.start, format_range.length, format_range.format = format_start, length, format
+                    ranges.append(format_range)
+
+                block.setUserState(self.highlight_text(block.text(), state, set_format))
+                block.layout().setFormats(ranges)
+                end = block.position() + block.length()
+            state = max(block.userState(), 0)
+            block = block.next()
+
+        if end > start:
+            document.markContentsDirty(start, end - start)
+
+    def defer_block(self, first: int, last: int = None):
+        last = first if last is None else last
+        ranges = self.dirty_ranges
+        ranges.append([first, last])
+        ranges.sort()
+        merged = [ranges[0]]
+        for dirty_range in ranges[1:]:
+            if dirty_range[0] <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], dirty_range[1])
+            else:
+                merged.append(dirty_range)
+        self.dirty_ranges = merged
+        self.growing_range = next(dirty_range for dirty_range in merged if dirty_range[0] <= last <= dirty_range[1])
+        if not self.idle_timer.isActive():
+            self.idle_timer.start()
+
+    def process_deferred(self):
+        document = self.document()
+        ranges, self.dirty_ranges = self.dirty_ranges, []
+        self.growing_range = None
+        self.budget = self.IDLE_BLOCK_BUDGET
+        while document is not None and ranges and self.budget > 0:
+            first, last = ranges[0]
+            block = document.findBlockByNumber(first)
+            if not block.isValid():
+                ranges.pop(0)
+                continue
+            self.rehighlightBlock(block)
+            first = max(first + 1, self.last_block + 1)
+            if first > last:
+                ranges.pop(0)
+            else:
+                ranges[0][0] = first
+
+        for first, last in ranges:
+            self.defer_block(first, last)
+        self.budget = self.SYNC_BLOCK_BUDGET
+        if self.dirty_ranges:
+            self.idle_timer.start()
+
+    def set_visible_blocks(self, first: int, last: int):
+        self.visible_blocks = (first, last)
+        document = self.document()
+        if document is None:
+            return
+        for range_first, range_last in self.dirty_ranges:
+            if range_first > last or range_last < first:
+                continue
+            block = document.findBlockByNumber(max(first, range_first))
+            while block.isValid() and block.blockNumber() <= min(last, range_last):
+                self.rehighlightBlock(block)
+                block = block.next()
+
+    def rehighlight(self):
+        document = self.document()
+        if not self.lazy or document is None:
+            return super().rehighlight()
+        first, last = self.visible_blocks
+        block = document.findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            self.rehighlightBlock(block)
+            block = block.next()
+        self.dirty_ranges = [[0, document.blockCount() - 1]]
+        self.growing_range = None
+        self.idle_timer.start()
+
+    @staticmethod
+    def measure_throughput(text: str, engine: str = 'scanner', repeat: int = 3) -> float:
+        document = QTextDocument()
+        document.setPlainText(text)
+        highlighter = PythonHighlighter(document, engine=engine, lazy=False)
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            highlighter.rehighlight()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        highlighter.setDocument(None)
+        return document.blockCount() / best if best else float('inf')
+
+class SearchIndex(QObject):
+    index_ready = Signal()
+    _built = Signal(object)
+
+    CHUNK_LINES = 512
+    MAX_CHUNK_LINES = 8192
+    PARALLEL_CHUNKS = 64
+    FLUSH_DELAY = 100
+    REBUILD_DELAY = 500
+    executor = None
+    executor_lock = threading.Lock()
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self.document = document
+        self.ready = False
+        self.building = False
+        self.chunk_texts = []
+        self.chunk_lines = []
+        self.chunk_sizes = []
+        self.postings = {}
+        self.line_total = 0
+        self.line_starts = None
+        self.position_starts = None
+        self.dirty = set()
+        self.updates = 0
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.FLUSH_DELAY)
+        self.flush_timer.timeout.connect(self.flush)
+        self.rebuild_timer = QTimer(self)
+        self.rebuild_timer.setSingleShot(True)
+        self.rebuild_timer.setInterval(self.REBUILD_DELAY)
+        self.rebuild_timer.timeout.connect(self.start)
+        self._built.connect(self.on_built)
+        document.contentsChange.connect(self.on_contents_change)
+
+    def start(self):
+        if self.building:
+            return
+        self.building = True
+        self.ready = False
+        self.flush_timer.stop()
+        self.dirty.clear()
+        threading.Thread(target=self.build, args=(self.document.revision(), self.document.toPlainText()),
+                         name='FayeIDE-search-index', daemon=True).start()
+
+    def build(self, revision, text):
+        try:
+            lines = text.split('\n')
+            starts = range(0, len(lines), self.CHUNK_LINES)
+            chunk_texts = ['\n'.join(lines[start:start + self.CHUNK_LINES]) for start in starts]
+            chunk_lines = [min(self.CHUNK_LINES, len(lines) - start) for start in starts]
+            del lines, text
+            if len(chunk_texts) > self.PARALLEL_CHUNKS:
+                postings = {}
+                batches = range(0, len(chunk_texts), self.PARALLEL_CHUNKS)
+                executor = self.shared_executor()
+                try:
+                    for part in executor.map(index_chunks, batches,
+                                             [chunk_texts[start:start + self.PARALLEL_CHUNKS] for start in batches]):
+                        for trigram, mask in part.items():
+                            postings[trigram] = postings.get(trigram, 0) | mask
+                except BrokenProcessPool:
+                    self.shutdown(executor)
+                    raise
             else:
-                self.setFormat(0, len(text), self.comment_format)
-                self.setCurrentBlockState(1)
+                postings = index_chunks(0, chunk_texts)
+            chunk_sizes = [utf16_length(chunk) + 1 for chunk in chunk_texts]
+            self._built.emit((revision, chunk_texts, chunk_lines, chunk_sizes, postings))
+        except Exception as e:
+            log_manager.log('error', f'Search index build failed: {str(e)}')
+            self._built.emit(None)
+
+    @classmethod
+    def shared_executor(cls):
+        with cls.executor_lock:
+            if cls.executor is None:
+                cls.executor = ProcessPoolExecutor()
+            return cls.executor
+
+    @classmethod
+    def shutdown(cls, executor=None):
+        with cls.executor_lock:
+            if cls.executor is None or executor is not None and executor is not cls.executor:
+                return
+            executor, cls.executor = cls.executor, None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def on_built(self, result):
+        self.building = False
+        if result is None:
+            return
+        revision, self.chunk_texts, self.chunk_lines, self.chunk_sizes, self.postings = result
+        if revision != self.document.revision():
+            self.rebuild_timer.start()
+            return
+        self.line_total = sum(self.chunk_lines)
+        self.line_starts = self.position_starts = None
+        self.updates = 0
+        self.ready = True
+        log_manager.log('debug', f'Search index built: {len(self.chunk_texts)} chunks, {len(self.postings)} trigrams')
+        self.index_ready.emit()
+
+    def ensure_starts(self):
+        if self.line_starts is None:
+            self.line_starts = list(accumulate(self.chunk_lines, initial=0))[:-1]
+        if self.position_starts is None:
+            self.position_starts = list(accumulate(self.chunk_sizes, initial=0))[:-1]
+
+    def on_contents_change(self, position, removed, added):
+        if not self.ready:
+            self.rebuild_timer.start()
+            return
+        document = self.document
+        last_block = document.findBlock(position + added)
+        if not last_block.isValid():
+            last_block = document.lastBlock()
+        first_line = document.findBlock(position).blockNumber()
+        delta = document.blockCount() - self.line_total
+        removed_lines = last_block.blockNumber() - first_line - delta
+        self.ensure_starts()
+        first_chunk = max(bisect_right(self.line_starts, first_line) - 1, 0)
+        last_chunk = max(bisect_right(self.line_starts, first_line + removed_lines) - 1, 0)
+        lines = sum(self.chunk_lines[first_chunk:last_chunk + 1]) + delta
+        self.updates += 1
+        if removed_lines < 0 or lines > self.MAX_CHUNK_LINES or self.updates > len(self.chunk_texts) * 4:
+            self.ready = False
+            self.rebuild_timer.start()
+            return
+        self.chunk_lines[first_chunk] = lines
+        for index in range(first_chunk + 1, last_chunk + 1):
+            self.chunk_lines[index] = self.chunk_sizes[index] = 0
+            self.chunk_texts[index] = ''
+            self.dirty.discard(index)
+        self.line_total += delta
+        self.line_starts = None
+        self.dirty.add(first_chunk)
+        self.flush_timer.start()
+
+    def flush(self):
+        if not self.dirty:
+            return
+        self.ensure_starts()
+        for index in self.dirty:
+            block = self.document.findBlockByNumber(self.line_starts[index])
+            lines = []
+            for _ in range(self.chunk_lines[index]):
+                lines.append(block.text())
+                block = block.next()
+            text = '\n'.join(lines)
+            self.chunk_texts[index] = text
+            self.chunk_sizes[index] = utf16_length(text) + 1 if lines else 0
+            bit = 1 << index
+            for trigram in chunk_trigrams(text):
+                self.postings[trigram] = self.postings.get(trigram, 0) | bit
+        self.dirty.clear()
+        self.position_starts = None
+
+    def candidates(self, text):
+        self.flush()
+        mask = (1 << len(self.chunk_texts)) - 1
+        for trigram in chunk_trigrams(text):
+            mask &= self.postings.get(trigram, 0)
+            if not mask:
+                break
+        return mask
+
+    def find(self, pattern, text, position, forward=True):
+        mask = self.candidates(text)
+        if not mask:
+            return None
+        self.ensure_starts()
+        current = max(bisect_right(self.position_starts, position) - 1, 0)
+        offset = utf16_to_index(self.chunk_texts[current], position - self.position_starts[current])
+        before = mask & ((1 << current) - 1)
+        after = mask >> (current + 1) << (current + 1)
+        if forward:
+            order = chain([(current, offset, None)], ((index, 0, None) for index in iter_bits(after)),
+                          ((index, 0, None) for index in iter_bits(before)), [(current, 0, offset)])
         else:
-            start_match = self.comment_start.match(text)
-            if start_match:
-                self.setFormat(start_match.start(), len(text), self.comment_format)
-                self.setCurrentBlockState(1)
+            order = chain([(current, 0, offset)], ((index, 0, None) for index in iter_bits_reversed(before)),
+                          ((index, 0, None) for index in iter_bits_reversed(after)), [(current, offset, None)])
+        for index, start, limit in order:
+            if not mask >> index & 1:
+                continue
+            text = self.chunk_texts[index]
+            if forward:
+                match = pattern.search(text, start)
+                if match and (limit is None or match.start() < limit):
+                    return self.match_range(index, match)
+            else:
+                last = None
+                for match in pattern.finditer(text, start):
+                    if limit is not None and match.start() >= limit:
+                        break
+                    last = match
+                if last:
+                    return self.match_range(index, last)
+        return None
+
+    def match_range(self, index, match):
+        to_utf16 = utf16_position_mapper(self.chunk_texts[index])
+        start = self.position_starts[index]
+        return start + to_utf16(match.start()), start + to_utf16(match.end())
+
+    def snapshot(self, text):
+        mask = self.candidates(text)
+        self.ensure_starts()
+        return [(self.position_starts[index], self.chunk_texts[index]) for index in iter_bits(mask)]
+
+class MatchCounter(QObject):
+    count_ready = Signal(object, object)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def start(self, pattern, chunks):
+        token = threading.Event()
+        threading.Thread(target=self.count, args=(token, pattern, chunks), daemon=True).start()
+        return token
+
+    def count(self, token, pattern, chunks):
+        starts = array('q')
+        for position, text in chunks:
+            if token.is_set():
+                return
+            to_utf16 = utf16_position_mapper(text)
+            for match in pattern.finditer(text):
+                if token.is_set():
+                    return
+                if match.start() != match.end():
+                    starts.append(position + to_utf16(match.start()))
+        if not token.is_set():
+            self.count_ready.emit(token, starts)
 
 class FindDialog(QDialog):
+    HIGHLIGHT_DELAY = 150
+    MAX_VISIBLE_MATCHES = 2000
+
     def __init__(self, parent = None):
         super().__init__(parent)
         self.parent = parent
         self.setWindowTitle("Find and replacement")
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.editor = None
+        self.revision = None
+        self.count_token = None
+        self.count_key = None
+        self.match_starts = None
+        self.highlight_format = QTextCharFormat()
+        self.highlight_format.setBackground(QColor("#404040"))
+        self.highlight_timer = QTimer(self)
+        self.highlight_timer.setSingleShot(True)
+        self.highlight_timer.setInterval(self.HIGHLIGHT_DELAY)
+        self.highlight_timer.timeout.connect(lambda: self.highlight_matches(self.find_input.text()))
+        MatchCounter.instance().count_ready.connect(self.on_match_count)
+        self.parent.tab_widget.currentChanged.connect(self.schedule_highlight)
         self.last_search = ""
         self.case_sensitive = False
         self.whole_words = False
         self.search_backward = False
+        self.use_regex = False
+        self.in_workspace = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -181,8 +1369,10 @@ class FindDialog(QDialog):
         find_label = QLabel("Find:")
         self.find_input = QLineEdit()
         self.find_input.textChanged.connect(self.find_text_changed)
+        self.count_label = QLabel()
         find_layout.addWidget(find_label)
         find_layout.addWidget(self.find_input)
+        find_layout.addWidget(self.count_label)
         layout.addLayout(find_layout)
 
         replace_layout = QHBoxLayout()
@@ -205,10 +1395,20 @@ class FindDialog(QDialog):
         self.backward_check = QCheckBox("Find back")
         self.backward_check.setChecked(self.search_backward)
         self.backward_check.stateChanged.connect(self.update_options)
+
+        self.regex_check = QCheckBox("Regular expression")
+        self.regex_check.setChecked(self.use_regex)
+        self.regex_check.stateChanged.connect(self.update_options)
+
+        self.workspace_check = QCheckBox("In workspace")
+        self.workspace_check.setChecked(self.in_workspace)
+        self.workspace_check.stateChanged.connect(self.update_options)
         
         options_layout.addWidget(self.case_check)
         options_layout.addWidget(self.whole_check)
         options_layout.addWidget(self.backward_check)
+        options_layout.addWidget(self.regex_check)
+        options_layout.addWidget(self.workspace_check)
         layout.addLayout(options_layout)
 
         button_layout = QHBoxLayout()
@@ -238,34 +1438,143 @@ class FindDialog(QDialog):
         self.case_sensitive = self.case_check.isChecked()
         self.whole_words = self.whole_check.isChecked()
         self.search_backward = self.backward_check.isChecked()
+        self.use_regex = self.regex_check.isChecked()
+        self.in_workspace = self.workspace_check.isChecked()
+        self.highlight_timer.start()
+        self.search_workspace()
         
     def find_text_changed(self):
         search_text = self.find_input.text()
         if search_text != self.last_search:
             self.last_search = search_text
-            self.highlight_matches(search_text)
+            self.highlight_timer.start()
+            self.search_workspace()
+
+    def search_workspace(self):
+        text = self.find_input.text()
+        if self.in_workspace and text:
+            self.parent.search_workspace(text, self.case_sensitive, self.whole_words, self.use_regex)
+
+    def current_pattern(self, text):
+        try:
+            return build_search_pattern(text, self.case_sensitive, self.whole_words, self.use_regex)
+        except re.error:
+            return None
+
+    def attach_editor(self, editor):
+        if editor is self.editor:
+            return
+        self.detach_editor()
+        self.editor = editor
+        if editor is not None:
+            editor.search_index()
+            self.revision = editor.document().revision()
+            editor.verticalScrollBar().valueChanged.connect(self.schedule_highlight)
+            editor.textChanged.connect(self.on_editor_text_changed)
+
+    def detach_editor(self):
+        if self.editor is None:
+            return
+        self.editor.verticalScrollBar().valueChanged.disconnect(self.schedule_highlight)
+        self.editor.textChanged.disconnect(self.on_editor_text_changed)
+        self.editor.set_extra_selections('find', [])
+        self.editor = None
+        self.count_key = None
+        self.match_starts = None
+
+    def schedule_highlight(self, *args):
+        self.highlight_timer.start()
+
+    def on_editor_text_changed(self):
+        revision = self.editor.document().revision()
+        if revision != self.revision:
+            self.revision = revision
+            self.highlight_timer.start()
 
     def highlight_matches(self, text):
         editor = self.parent.tab_widget.currentWidget()
-        if not editor or not text:
+        self.attach_editor(editor)
+        if not editor:
             return
 
-        cursor = editor.textCursor()
-        cursor.select(QTextCursor.SelectionType.Document)
-        cursor.setCharFormat(QTextCharFormat())
-        cursor.clearSelection()
+        pattern = self.current_pattern(text) if text else None
+        if pattern is None:
+            editor.set_extra_selections('find', [])
+            self.cancel_count()
+            self.count_key = None
+            self.count_label.setText("")
+            return
 
-        if text:
-            highlight_format = QTextCharFormat()
-            highlight_format.setBackground(QColor("#404040"))
-            
-            cursor = editor.document().find(text, 0,
-                self.get_find_flags())
-            
-            while not cursor.isNull():
-                cursor.mergeCharFormat(highlight_format)
-                cursor = editor.document().find(text, cursor,
-                    self.get_find_flags())
+        first_block = editor.firstVisibleBlock()
+        last_block = editor.cursorForPosition(editor.viewport().rect().bottomRight()).block()
+        start = first_block.position()
+        cursor = QTextCursor(editor.document())
+        cursor.setPosition(start)
+        cursor.setPosition(last_block.position() + last_block.length() - 1, QTextCursor.MoveMode.KeepAnchor)
+        visible_text = cursor.selectedText().replace('\u2029', '\n')
+        to_utf16 = utf16_position_mapper(visible_text)
+
+        selections = []
+        for match in pattern.finditer(visible_text):
+            if match.start() == match.end():
+                continue
+            selection = QTextEdit.ExtraSelection()
+            selection.format = self.highlight_format
+            selection.cursor = QTextCursor(editor.document())
+            selection.cursor.setPosition(start + to_utf16(match.start()))
+            selection.cursor.setPosition(start + to_utf16(match.end()), QTextCursor.MoveMode.KeepAnchor)
+            selections.append(selection)
+            if len(selections) >= self.MAX_VISIBLE_MATCHES:
+                break
+        editor.set_extra_selections('find', selections)
+        self.count_matches(editor, pattern)
+
+    def count_matches(self, editor, pattern):
+        key = (id(editor), editor.document().revision(), pattern.pattern, pattern.flags)
+        if key == self.count_key:
+            return
+        self.count_key = key
+        self.cancel_count()
+        self.match_starts = None
+        self.count_label.setText("Counting...")
+        index = editor.search_index()
+        if index.ready and not self.use_regex:
+            chunks = index.snapshot(self.find_input.text())
+        else:
+            chunks = [(0, editor.toPlainText())]
+        self.count_token = MatchCounter.instance().start(pattern, chunks)
+
+    def cancel_count(self):
+        if self.count_token is not None:
+            self.count_token.set()
+            self.count_token = None
+
+    def on_match_count(self, token, starts):
+        if token is self.count_token:
+            self.match_starts = starts
+            self.update_count_label()
+
+    def update_count_label(self):
+        if self.match_starts is None or self.editor is None:
+            return
+        count = len(self.match_starts)
+        cursor = self.editor.textCursor()
+        if cursor.hasSelection():
+            index = bisect_left(self.match_starts, cursor.selectionStart())
+            if index < count and self.match_starts[index] == cursor.selectionStart():
+                self.count_label.setText(f"{index + 1} of {count}")
+                return
+        self.count_label.setText(f"{count} matches")
+
+    def hideEvent(self, event):
+        self.highlight_timer.stop()
+        self.cancel_count()
+        self.detach_editor()
+        super().hideEvent(event)
+
+    def closeEvent(self, event):
+        self.cancel_count()
+        super().closeEvent(event)
 
     def get_find_flags(self):
         flags = QTextDocument.FindFlag(0)
@@ -283,6 +1592,7 @@ class FindDialog(QDialog):
         if not editor or not text:
             return
 
+        self.attach_editor(editor)
         flags = self.get_find_flags()
         if not forward:
             flags |= QTextDocument.FindFlag.FindBackward
@@ -293,20 +1603,45 @@ class FindDialog(QDialog):
         else:
             start = cursor.anchor()
 
-        new_cursor = editor.document().find(text, start, flags)
+        index = editor.search_index()
+        pattern = self.current_pattern(text)
+        if index.ready and not self.use_regex and pattern is not None:
+            backward = bool(flags & QTextDocument.FindFlag.FindBackward)
+            found = index.find(pattern, text, cursor.selectionStart() if backward else cursor.selectionEnd(),
+                               not backward)
+            if found:
+                new_cursor = QTextCursor(editor.document())
+                new_cursor.setPosition(found[0])
+                new_cursor.setPosition(found[1], QTextCursor.MoveMode.KeepAnchor)
+                editor.setTextCursor(new_cursor)
+                self.update_count_label()
+            else:
+                self.count_label.setText(f"'{text}' not found")
+            return
+
+        query = text
+        if self.use_regex:
+            options = QRegularExpression.PatternOption.NoPatternOption
+            if not self.case_sensitive:
+                options = QRegularExpression.PatternOption.CaseInsensitiveOption
+            query = QRegularExpression(text, options)
+            if not query.isValid():
+                return
+
+        new_cursor = editor.document().find(query, start, flags)
         
         if new_cursor.isNull():
             if forward:
                 start = 0
             else:
-                start = len(editor.toPlainText())
-            new_cursor = editor.document().find(text, start, flags)
+                start = editor.document().characterCount() - 1
+            new_cursor = editor.document().find(query, start, flags)
             
         if not new_cursor.isNull():
             editor.setTextCursor(new_cursor)
+            self.update_count_label()
         else:
-            QMessageBox.information(self, "Search",
-                f"Text '{text}' not found.")
+            self.count_label.setText(f"'{text}' not found")
 
     def replace_text(self):
         editor = self.parent.tab_widget.currentWidget()
@@ -315,7 +1650,18 @@ class FindDialog(QDialog):
 
         cursor = editor.textCursor()
         if cursor.hasSelection():
-            cursor.insertText(self.replace_input.text())
+            replace_with = self.replace_input.text()
+            if self.use_regex:
+                pattern = self.current_pattern(self.find_input.text())
+                match = pattern.fullmatch(cursor.selectedText()) if pattern else None
+                if match is None:
+                    return
+                try:
+                    replace_with = match.expand(replace_with)
+                except (re.error, IndexError) as e:
+                    QMessageBox.warning(self, "Replacement", f"Invalid replacement: {str(e)}")
+                    return
+            cursor.insertText(replace_with)
             self.find_text(forward=True)
 
     def replace_all_text(self):
@@ -329,71 +1675,1767 @@ class FindDialog(QDialog):
         if not text:
             return
 
-        cursor = editor.textCursor()
-        cursor.beginEditBlock()
-        cursor.movePosition(QTextCursor.MoveOperation.Start)
-        editor.setTextCursor(cursor)
-        
-        count = 0
-        while True:
-            if not editor.find(text, self.get_find_flags()):
-                break
-            cursor = editor.textCursor()
-            cursor.insertText(replace_with)
-            count += 1
-            
-        cursor.endEditBlock()
+        try:
+            pattern = build_search_pattern(text, self.case_sensitive, self.whole_words, self.use_regex)
+            content = editor.toPlainText()
+            edits, count = compute_replacements(content, pattern, replace_with, self.use_regex)
+        except (re.error, IndexError) as e:
+            QMessageBox.warning(self, "Replacement", f"Invalid expression: {str(e)}")
+            return
+
+        apply_text_edits(editor.document(), content, edits)
+        log_manager.log('info', f'Replaced {count} matches in {len(edits)} edits: {editor.file_path or "New file"}')
         QMessageBox.information(self, "Replacement", f"Replacement {count} coincidences.")
 
-class CodeEditor(QPlainTextEdit):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setFont(QFont("Cascadia Code", 12))
-        self.file_path = None
-        self.highlighter = PythonHighlighter(self.document())
-        self.setStyleSheet("""
-            QPlainTextEdit {
-                background-color: #1E1E1E;
-                color: #D4D4D4;
-                border: 1px solid #3E3E3E;
-            }
-        """)
-        self.textChanged.connect(self.on_text_changed)
-        
-    def on_text_changed(self):
-        log_manager.log('debug', f'The text has been changed in the editor. {self.file_path or "New file"}')
+class CompletionService(QObject):
+    completions_ready = Signal(object, int, list)
 
-class TabWidget(QTabWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setTabsClosable(True)
-        self.setMovable(True)
-        self.tabCloseRequested.connect(self.close_tab)
-        self.create_new_tab()
-        self.currentChanged.connect(self.on_tab_changed)
-        
-    def create_new_tab(self, file_path=None):
-        editor = CodeEditor(self)
-        if file_path:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                editor.setPlainText(content)
-                editor.file_path = file_path
-                tab_name = os.path.basename(file_path)
-            except Exception as e:
-                log_manager.log('error', f'Error opening file {file_path}: {str(e)}')
-                return None
-        else:
-            tab_name = "New file"
+    MAX_COMPLETIONS = 200
+    _instance = None
+
+    def __init__(self):
+        super().__init__()
+        self.requests = queue.Queue()
+        self.projects = {}
+        self.scripts = {}
+        self.thread = threading.Thread(target=self.run, name='FayeIDE-completion', daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def request(self, editor, request_id, code, line, column):
+        self.requests.put((editor, request_id, code, line, column, editor.file_path))
+
+    def forget(self, editor):
+        self.requests.put(('forget', editor.file_path or id(editor), id(editor)))
+
+    def warm_up(self):
+        self.requests.put(('warm_up',))
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            requests = {}
+            while True:
+                if request[0] == 'forget':
+                    self.scripts.pop(request[1], None)
+                    requests.pop(request[2], None)
+                elif request[0] == 'warm_up':
+                    import jedi
+                else:
+                    requests[id(request[0])] = request
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+            for editor, request_id, code, line, column, file_path in requests.values():
+                try:
+                    script = self.get_script(code, file_path, id(editor))
+                    names = [completion.name for completion in script.complete(line, column)[:self.MAX_COMPLETIONS]]
+                except Exception as e:
+                    log_manager.log('warning', f'Completion failed: {str(e)}')
+                    names = []
+                self.completions_ready.emit(editor, request_id, names)
+
+    def get_script(self, code, file_path, editor_key):
+        import jedi
+        key = file_path or editor_key
+        cached = self.scripts.get(key)
+        if cached and cached[0] == code:
+            return cached[1]
+        root = os.path.dirname(os.path.abspath(file_path)) if file_path else os.getcwd()
+        project = self.projects.get(root)
+        if project is None:
+            project = self.projects[root] = jedi.get_default_project(root)
+        script = jedi.Script(code, path=file_path, project=project)
+        self.scripts[key] = (code, script)
+        return script
+
+class DiagnosticsService(QObject):
+    diagnostics_ready = Signal(object, int, list)
+    analysis_done = Signal(str, object)
+
+    CACHE_SIZE = 64
+    _instance = None
+
+    def __init__(self):
+        super().__init__()
+        self.executor = None
+        self.cache = OrderedDict()
+        self.waiting = {}
+        self.futures = {}
+        self.digests = {}
+        self.analysis_done.connect(self.on_analysis_done)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def warm_up(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=1)
+            self.executor.submit(int)
+
+    def analyze(self, editor, revision, text, file_path):
+        digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+        diagnostics = self.cache.get(digest)
+        if diagnostics is not None:
+            self.cache.move_to_end(digest)
+            self.diagnostics_ready.emit(editor, revision, diagnostics)
+            return
+        self.forget(editor)
+        self.waiting.setdefault(digest, []).append((editor, revision))
+        self.digests[id(editor)] = digest
+        if digest in self.futures:
+            return
+        self.warm_up()
+        future = self.executor.submit(analyze_source, text, file_path or '<untitled>')
+        self.futures[digest] = future
+        future.add_done_callback(lambda done: self.analysis_done.emit(digest, done))
+
+    def on_analysis_done(self, digest, future):
+        if self.futures.get(digest) is not future:
+            waiting = []
+        else:
+            del self.futures[digest]
+            waiting = self.waiting.pop(digest, [])
+        for editor, revision in waiting:
+            if self.digests.get(id(editor)) == digest:
+                del self.digests[id(editor)]
+        if future.cancelled():
+            return
+        try:
+            diagnostics = future.result()
+        except Exception as e:
+            log_manager.log('error', f'Diagnostics failed: {str(e)}')
+            self.shutdown()
+            return
+        self.cache[digest] = diagnostics
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        for editor, revision in waiting:
+            self.diagnostics_ready.emit(editor, revision, diagnostics)
+
+    def forget(self, editor):
+        digest = self.digests.pop(id(editor), None)
+        if digest is None:
+            return
+        waiting = [entry for entry in self.waiting.get(digest, []) if entry[0] is not editor]
+        if waiting:
+            self.waiting[digest] = waiting
+            return
+        self.waiting.pop(digest, None)
+        future = self.futures.pop(digest, None)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+class OutlineService(QObject):
+    outline_ready = Signal(object, int, list)
+
+    CACHE_SIZE = 20000
+    MAX_MERGED_SEGMENTS = 8
+    _instance = None
+
+    def __init__(self):
+        super().__init__()
+        self.requests = queue.Queue()
+        self.segments = OrderedDict()
+        self.parsed = 0
+        self.thread = threading.Thread(target=self.run, name='FayeIDE-outline', daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def request(self, editor, revision, text):
+        self.requests.put((editor, revision, text))
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            requests = {}
+            while True:
+                requests[id(request[0])] = request
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+            for editor, revision, text in requests.values():
+                try:
+                    symbols = self.build_outline(text)
+                except Exception as e:
+                    log_manager.log('warning', f'Outline failed: {str(e)}')
+                    symbols = []
+                self.outline_ready.emit(editor, revision, symbols)
+
+    def segment_outline(self, segment):
+        cached = self.segments.get(segment)
+        if cached is None:
+            cached = self.segments[segment] = outline_segment(segment)
+            self.parsed += 1
+        else:
+            self.segments.move_to_end(segment)
+        return cached
+
+    def build_outline(self, text):
+        symbols = []
+        self.parsed = 0
+        segments = split_top_level(text.split('\n'))
+        index = 0
+        while index < len(segments):
+            start, segment = segments[index]
+            segment_symbols, valid = self.segment_outline(segment)
+            index += 1
+            merged = segment
+            for end in range(index, min(index + self.MAX_MERGED_SEGMENTS, len(segments))):
+                if valid:
+                    break
+                merged += '\n' + segments[end][1]
+                merged_symbols, valid = self.segment_outline(merged)
+                if valid:
+                    segment_symbols = merged_symbols
+                    index = end + 1
+            symbols.extend((start + line, start + end_line, depth, kind, name)
+                           for line, end_line, depth, kind, name in segment_symbols)
+        while len(self.segments) > self.CACHE_SIZE:
+            self.segments.popitem(last=False)
+        log_manager.log('debug', f'Outline built: {len(symbols)} symbols, {self.parsed} blocks parsed')
+        return symbols
+
+class SymbolIndex(QObject):
+    indexing_finished = Signal(int)
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, size INTEGER);
+        CREATE TABLE IF NOT EXISTS symbols (name TEXT, kind TEXT, path TEXT, line INTEGER,
+                                            column INTEGER, container TEXT);
+        CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS symbols_path ON symbols (path);
+    """
+    BATCH_SIZE = 500
+
+    def __init__(self, root, parent=None, db_path=None):
+        super().__init__(parent)
+        self.root = os.path.abspath(root)
+        if db_path is None:
+            digest = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16]
+            db_path = os.path.join(os.path.expanduser('~'), '.faye_ide', 'index', f'{digest}.sqlite')
+        self.db_path = db_path
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def open_connection(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(self.SCHEMA)
+        return connection
+
+    def query_connection(self):
+        if self.connection is None:
+            self.connection = self.open_connection()
+        return self.connection
+
+    def start(self):
+        threading.Thread(target=self.index_workspace, name='FayeIDE-indexer', daemon=True).start()
+
+    def index_workspace(self):
+        with self.lock:
+            connection = self.open_connection()
+            try:
+                known = {path: (mtime, size) for path, mtime, size in
+                         connection.execute('SELECT path, mtime, size FROM files')}
+                changed = {}
+                for file_path, stat in iter_workspace_files(self.root, '.py', load_ignore_patterns(self.root)):
+                    signature = (stat.st_mtime, stat.st_size)
+                    if known.pop(file_path, None) != signature:
+                        changed[file_path] = signature
+
+                with connection:
+                    for file_path in known:
+                        connection.execute('DELETE FROM symbols WHERE path = ?', (file_path,))
+                        connection.execute('DELETE FROM files WHERE path = ?', (file_path,))
+
+                if len(changed) > self.BATCH_SIZE:
+                    with ProcessPoolExecutor() as executor:
+                        results = executor.map(extract_symbols, changed, chunksize=64)
+                        self.store(connection, results, changed)
+                else:
+                    self.store(connection, map(extract_symbols, changed), changed)
+            except Exception as e:
+                log_manager.log('error', f'Workspace indexing failed: {str(e)}')
+                changed = {}
+            finally:
+                connection.close()
+        log_manager.log('info', f'Workspace index updated: {len(changed)} files parsed')
+        self.indexing_finished.emit(len(changed))
+
+    def store(self, connection, results, signatures):
+        batch = 0
+        connection.execute('BEGIN')
+        for file_path, symbols in results:
+            mtime, size = signatures[file_path]
+            connection.execute('DELETE FROM symbols WHERE path = ?', (file_path,))
+            connection.executemany(
+                'INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?)',
+                [(name, kind, file_path, line, column, container)
+                 for name, kind, line, column, container in symbols])
+            connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?)', (file_path, mtime, size))
+            batch += 1
+            if batch % self.BATCH_SIZE == 0:
+                connection.execute('COMMIT')
+                connection.execute('BEGIN')
+        connection.execute('COMMIT')
+
+    def update_file(self, file_path):
+        file_path = os.path.abspath(file_path)
+        if not file_path.endswith('.py') or not file_path.startswith(self.root + os.sep):
+            return
+        threading.Thread(target=self.index_file, args=(file_path,), daemon=True).start()
+
+    def index_file(self, file_path):
+        with self.lock:
+            connection = self.open_connection()
+            try:
+                stat = os.stat(file_path)
+                self.store(connection, [extract_symbols(file_path)],
+                           {file_path: (stat.st_mtime, stat.st_size)})
+            except Exception as e:
+                log_manager.log('error', f'Error indexing file {file_path}: {str(e)}')
+            finally:
+                connection.close()
+
+    def search(self, query, limit=100):
+        connection = self.query_connection()
+        pattern = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        columns = 'SELECT name, kind, path, line, column, container FROM symbols'
+        results = connection.execute(
+            f"{columns} WHERE name LIKE ? ESCAPE '\\' ORDER BY length(name), name LIMIT ?",
+            (pattern + '%', limit)).fetchall()
+        if len(results) < limit:
+            results += connection.execute(
+                f"{columns} WHERE name LIKE ? ESCAPE '\\' AND name NOT LIKE ? ESCAPE '\\' "
+                f"ORDER BY length(name), name LIMIT ?",
+                ('%' + pattern + '%', pattern + '%', limit - len(results))).fetchall()
+        return results
+
+    def definitions(self, name):
+        return self.query_connection().execute(
+            'SELECT name, kind, path, line, column, container FROM symbols WHERE name = ?', (name,)).fetchall()
+
+class SymbolSearchDialog(QDialog):
+    def __init__(self, parent, symbol_index, query='', results=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.symbol_index = symbol_index
+        self.setWindowTitle("Go to symbol")
+        self.resize(600, 400)
+
+        layout = QVBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setText(query)
+        self.search_input.textChanged.connect(self.update_results)
+        self.search_input.returnPressed.connect(self.open_selected)
+        self.results_list = QListWidget()
+        self.results_list.itemActivated.connect(self.open_selected)
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.results_list)
+        self.setLayout(layout)
+
+        if results is not None:
+            self.show_results(results)
+        else:
+            self.update_results(query)
+
+    def update_results(self, query):
+        self.show_results(self.symbol_index.search(query) if query else [])
+
+    def show_results(self, results):
+        self.results_list.clear()
+        for name, kind, path, line, column, container in results:
+            qualified = f'{container}.{name}' if container else name
+            relative = os.path.relpath(path, self.symbol_index.root)
+            item = QListWidgetItem(f'{qualified}    {kind}    {relative}:{line}')
+            item.setData(Qt.ItemDataRole.UserRole, (path, line, column))
+            self.results_list.addItem(item)
+        if self.results_list.count():
+            self.results_list.setCurrentRow(0)
+
+    def open_selected(self, item=None):
+        item = item or self.results_list.currentItem()
+        if item is None:
+            return
+        path, line, column = item.data(Qt.ItemDataRole.UserRole)
+        self.parent.tab_widget.open_location(path, line, column)
+        self.close()
+
+class PathIndex(QObject):
+    index_ready = Signal(int)
+    index_changed = Signal(int)
+    _built = Signal(object)
+    _rescanned = Signal(object)
+
+    MAX_WATCHED_DIRECTORIES = 8192
+    RESCAN_DELAY = 200
+    FULL_SEARCH_LIMIT = 20000
+    SAMPLE_FACTOR = 20
+
+    def __init__(self, root, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.ignore_patterns = load_ignore_patterns(root)
+        self.ready = False
+        self.paths = {}
+        self.groups = {}
+        self.directories = {}
+        self.last_query = None
+        self.last_matches = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.changed_directories = set()
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(self.RESCAN_DELAY)
+        self.rescan_timer.timeout.connect(self.rescan)
+        self.rescanning = False
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._built.connect(self.on_built)
+        self._rescanned.connect(self.on_rescanned)
+
+    def start(self):
+        threading.Thread(target=self.build, daemon=True).start()
+
+    def absolute_path(self, relative_path):
+        return os.path.join(self.root, *relative_path.split('/')) if relative_path else self.root
+
+    def scan_directory(self, relative_directory):
+        files, subdirectories = set(), set()
+        with os.scandir(self.absolute_path(relative_directory)) as entries:
+            for entry in entries:
+                relative_path = f'{relative_directory}/{entry.name}' if relative_directory else entry.name
+                try:
+                    is_directory = entry.is_dir(follow_symlinks=False)
+                    if self.ignore_patterns and is_ignored(relative_path, is_directory, self.ignore_patterns):
+                        continue
+                    if is_directory:
+                        if entry.name not in IGNORED_DIRS and not entry.name.startswith('.'):
+                            subdirectories.add(entry.name)
+                    else:
+                        files.add(entry.name)
+                except OSError:
+                    continue
+        return files, subdirectories
+
+    def walk(self, relative_directory):
+        directories = {}
+        stack = [relative_directory]
+        while stack:
+            directory = stack.pop()
+            try:
+                files, subdirectories = self.scan_directory(directory)
+            except OSError:
+                continue
+            directories[directory] = (files, subdirectories)
+            stack.extend(f'{directory}/{name}' if directory else name for name in subdirectories)
+        return directories
+
+    def build(self):
+        started = time.perf_counter()
+        directories = self.walk('')
+        paths, groups = {}, {}
+        for directory, (files, _) in directories.items():
+            for name in files:
+                relative_path = f'{directory}/{name}' if directory else name
+                lowered = relative_path.lower()
+                paths[lowered] = relative_path
+                groups.setdefault(character_mask(lowered), []).append(lowered)
+        log_manager.log('info', f'Path index built: {len(paths)} files in {time.perf_counter() - started:.2f}s')
+        self._built.emit((directories, paths, groups))
+
+    def on_built(self, result):
+        self.directories, self.paths, self.groups = result
+        self.last_query = self.last_matches = None
+        self.watch(self.directories)
+        self.ready = True
+        self.index_ready.emit(len(self.paths))
+
+    def watch(self, directories):
+        available = self.MAX_WATCHED_DIRECTORIES - len(self.watcher.directories())
+        if available > 0:
+            shallow_first = sorted(directories, key=lambda directory: directory.count('/'))
+            self.watcher.addPaths([self.absolute_path(directory) for directory in shallow_first[:available]])
+
+    def add_path(self, relative_path):
+        lowered = relative_path.lower()
+        if lowered not in self.paths:
+            self.paths[lowered] = relative_path
+            self.groups.setdefault(character_mask(lowered), []).append(lowered)
+
+    def remove_path(self, relative_path):
+        lowered = relative_path.lower()
+        if self.paths.pop(lowered, None) is not None:
+            group = self.groups[character_mask(lowered)]
+            group.remove(lowered)
+
+    def remove_directory(self, relative_directory):
+        files, subdirectories = self.directories.pop(relative_directory, (set(), set()))
+        for name in files:
+            self.remove_path(f'{relative_directory}/{name}' if relative_directory else name)
+        for name in subdirectories:
+            self.remove_directory(f'{relative_directory}/{name}' if relative_directory else name)
+        path = self.absolute_path(relative_directory)
+        if path in self.watcher.directories():
+            self.watcher.removePath(path)
+
+    def on_directory_changed(self, path):
+        relative_directory = os.path.relpath(path, self.root).replace(os.sep, '/')
+        self.changed_directories.add('' if relative_directory == '.' else relative_directory)
+        self.rescan_timer.start()
+
+    def rescan(self):
+        if self.rescanning:
+            return
+        changed, self.changed_directories = self.changed_directories, set()
+        known = {directory: self.directories[directory][1] for directory in changed if directory in self.directories}
+        if not known:
+            return
+        self.rescanning = True
+        self.pool.start(lambda: self.rescan_worker(known))
+
+    def rescan_worker(self, known):
+        scanned = {}
+        for directory, old_subdirectories in known.items():
+            try:
+                files, subdirectories = self.scan_directory(directory)
+            except OSError:
+                scanned[directory] = None
+                continue
+            prefix = f'{directory}/' if directory else ''
+            added = {name: self.walk(prefix + name) for name in subdirectories - old_subdirectories}
+            scanned[directory] = (files, subdirectories, added)
+        self._rescanned.emit(scanned)
+
+    def on_rescanned(self, scanned):
+        self.rescanning = False
+        for directory in sorted(scanned):
+            if directory not in self.directories:
+                continue
+            if scanned[directory] is None:
+                self.remove_directory(directory)
+                continue
+            old_files, old_subdirectories = self.directories[directory]
+            files, subdirectories, walked = scanned[directory]
+            self.directories[directory] = (files, subdirectories)
+            prefix = f'{directory}/' if directory else ''
+            for name in old_files - files:
+                self.remove_path(prefix + name)
+            for name in files - old_files:
+                self.add_path(prefix + name)
+            for name in old_subdirectories - subdirectories:
+                self.remove_directory(prefix + name)
+            for name in subdirectories - old_subdirectories:
+                added = walked.get(name, {})
+                for added_directory, (added_files, _) in added.items():
+                    for added_name in added_files:
+                        self.add_path(f'{added_directory}/{added_name}')
+                self.directories.update(added)
+                self.watch(added)
+        self.last_query = self.last_matches = None
+        self.index_changed.emit(len(self.paths))
+        if self.changed_directories:
+            self.rescan_timer.start()
+
+    def search(self, query, limit=50):
+        query = ''.join(query.lower().split())
+        if not query:
+            return []
+        characters = [re.escape(character) for character in query]
+        fuzzy = re.compile(''.join(f'[^{character}]*{character}' for character in characters))
+        if self.last_query and query.startswith(self.last_query):
+            matches = list(filter(fuzzy.match, self.last_matches))
+            complete = True
+        else:
+            query_mask = character_mask(query)
+            groups = [group for mask, group in self.groups.items() if mask & query_mask == query_mask]
+            candidates = filter(fuzzy.match, chain.from_iterable(groups))
+            if sum(map(len, groups)) <= self.FULL_SEARCH_LIMIT:
+                matches = list(candidates)
+                complete = True
+            else:
+                matches = list(islice(candidates, limit * self.SAMPLE_FACTOR))
+                complete = len(matches) < limit * self.SAMPLE_FACTOR
+        matches.sort(key=len)
+        self.last_query, self.last_matches = (query, matches) if complete else (None, None)
+
+        in_name = re.compile(re.escape(query) + '[^/]*$')
+        fuzzy_name = re.compile('(?:.*/)?' + ''.join(f'[^/{character}]*{character}' for character in characters)
+                                + '[^/]*$')
+        results = list(islice(filter(in_name.search, matches), limit))
+        for tier in (fuzzy_name.match, None):
+            if len(results) >= limit:
+                break
+            seen = set(results)
+            results.extend(islice((path for path in filter(tier, matches) if path not in seen),
+                                  limit - len(results)))
+        return [self.paths[path] for path in results]
+
+class QuickOpenDialog(QDialog):
+    def __init__(self, parent, path_index):
+        super().__init__(parent)
+        self.parent = parent
+        self.path_index = path_index
+        self.setWindowTitle("Quick open")
+        self.resize(600, 400)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+
+        layout = QVBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.textChanged.connect(self.update_results)
+        self.search_input.returnPressed.connect(self.open_selected)
+        self.status_label = QLabel()
+        self.results_list = QListWidget()
+        self.results_list.itemActivated.connect(self.open_selected)
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.results_list)
+        self.setLayout(layout)
+
+        path_index.index_ready.connect(self.refresh)
+        path_index.index_changed.connect(self.refresh)
+        self.refresh()
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+            row = self.results_list.currentRow() + (1 if event.key() == Qt.Key.Key_Down else -1)
+            if 0 <= row < self.results_list.count():
+                self.results_list.setCurrentRow(row)
+            return
+        super().keyPressEvent(event)
+
+    def refresh(self, *args):
+        self.update_results(self.search_input.text())
+
+    def update_results(self, query):
+        if not self.path_index.ready:
+            self.status_label.setText("Indexing files...")
+            return
+        started = time.perf_counter()
+        results = self.path_index.search(query)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.status_label.setText(f"{len(self.path_index.paths)} files indexed"
+                                  + (f", {len(results)} shown in {elapsed:.1f} ms" if query else ""))
+        self.results_list.clear()
+        for relative_path in results:
+            directory, _, name = relative_path.rpartition('/')
+            item = QListWidgetItem(f'{name}    {directory}' if directory else name)
+            item.setData(Qt.ItemDataRole.UserRole, self.path_index.absolute_path(relative_path))
+            self.results_list.addItem(item)
+        if self.results_list.count():
+            self.results_list.setCurrentRow(0)
+
+    def open_selected(self, item=None):
+        item = item or self.results_list.currentItem()
+        if item is None:
+            return
+        self.parent.tab_widget.open_file(item.data(Qt.ItemDataRole.UserRole))
+        self.close()
+
+class WorkspaceSearch(QObject):
+    results_found = Signal(int, list)
+    search_finished = Signal(int)
+
+    FIRST_BATCH_SIZE = 16
+    BATCH_SIZE = 128
+    MAX_FILE_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, root, parent=None, max_workers=None):
+        super().__init__(parent)
+        self.root = root
+        self.max_workers = max_workers
+        self.executor = None
+        self.search_id = 0
+        self.futures = []
+
+    def warm_up(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.max_workers)
+            self.executor.submit(int)
+
+    def start(self, pattern):
+        self.cancel()
+        self.warm_up()
+        search_id = self.search_id
+        threading.Thread(target=self.dispatch, args=(search_id, pattern.pattern, pattern.flags),
+                         name='FayeIDE-search', daemon=True).start()
+        return search_id
+
+    def cancel(self):
+        self.search_id += 1
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.cancel()
+
+    def dispatch(self, search_id, pattern_source, pattern_flags):
+        futures = []
+        batch = []
+        batch_size = self.FIRST_BATCH_SIZE
+        ignore_patterns = load_ignore_patterns(self.root)
+        for file_path, stat in iter_workspace_files(self.root, ignore_patterns=ignore_patterns):
+            if search_id != self.search_id:
+                return
+            if stat.st_size > self.MAX_FILE_SIZE:
+                continue
+            batch.append(file_path)
+            if len(batch) >= batch_size:
+                futures.append(self.submit(search_id, batch, pattern_source, pattern_flags))
+                batch = []
+                batch_size = self.BATCH_SIZE
+        if batch:
+            futures.append(self.submit(search_id, batch, pattern_source, pattern_flags))
+        wait(futures)
+        if search_id == self.search_id:
+            self.search_finished.emit(search_id)
+
+    def submit(self, search_id, batch, pattern_source, pattern_flags):
+        future = self.executor.submit(search_files, batch, pattern_source, pattern_flags)
+        future.add_done_callback(lambda done: self.on_batch_done(search_id, done))
+        self.futures.append(future)
+        return future
+
+    def on_batch_done(self, search_id, future):
+        if future.cancelled() or search_id != self.search_id:
+            return
+        try:
+            results = future.result()
+        except Exception as e:
+            log_manager.log('error', f'Workspace search failed: {str(e)}')
+            return
+        if results:
+            self.results_found.emit(search_id, results)
+
+    def shutdown(self):
+        self.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+class SearchResultsPanel(QWidget):
+    MAX_RESULTS = 10000
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.search_id = None
+        self.file_count = 0
+        self.match_count = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.status_label = QLabel()
+        self.results_tree = QTreeWidget()
+        self.results_tree.setHeaderHidden(True)
+        self.results_tree.itemActivated.connect(self.open_result)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.results_tree)
+
+    def begin(self, search_id, text):
+        self.search_id = search_id
+        self.file_count = self.match_count = 0
+        self.results_tree.clear()
+        self.status_label.setText(f"Searching for '{text}'...")
+
+    def add_results(self, search_id, results):
+        if search_id != self.search_id:
+            return
+        root = self.main_window.workspace_root
+        for file_path, matches in results:
+            if self.match_count >= self.MAX_RESULTS:
+                break
+            file_item = QTreeWidgetItem([f'{os.path.relpath(file_path, root)} ({len(matches)})'])
+            for line_number, start, end, line in matches[:self.MAX_RESULTS - self.match_count]:
+                match_item = QTreeWidgetItem([f'{line_number}: {line.strip()}'])
+                match_item.setData(0, Qt.ItemDataRole.UserRole, (file_path, line_number, start))
+                file_item.addChild(match_item)
+            self.results_tree.addTopLevelItem(file_item)
+            self.file_count += 1
+            self.match_count += len(matches)
+        self.status_label.setText(f"{self.match_count} matches in {self.file_count} files...")
+
+    def finish(self, search_id):
+        if search_id != self.search_id:
+            return
+        suffix = ' (truncated)' if self.match_count >= self.MAX_RESULTS else ''
+        self.status_label.setText(f"{self.match_count} matches in {self.file_count} files{suffix}")
+
+    def open_result(self, item):
+        location = item.data(0, Qt.ItemDataRole.UserRole)
+        if location:
+            self.main_window.tab_widget.open_location(*location)
+
+class ProblemsPanel(QWidget):
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.editor = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.status_label = QLabel()
+        self.problems_tree = QTreeWidget()
+        self.problems_tree.setHeaderLabels(["Line", "Severity", "Message"])
+        self.problems_tree.setRootIsDecorated(False)
+        self.problems_tree.itemActivated.connect(self.open_problem)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.problems_tree)
+
+    def show_diagnostics(self, editor, diagnostics):
+        self.editor = editor
+        self.problems_tree.clear()
+        if editor is None:
+            self.status_label.setText("")
+            return
+        items = []
+        for line, column, end_column, severity, message in diagnostics:
+            item = QTreeWidgetItem([f'{line}:{column + 1}', severity, message])
+            item.setData(0, Qt.ItemDataRole.UserRole, (line, column))
+            item.setForeground(1, QColor(CodeEditor.DIAGNOSTIC_COLORS[severity]))
+            items.append(item)
+        self.problems_tree.addTopLevelItems(items)
+        errors = sum(1 for diagnostic in diagnostics if diagnostic[3] == 'error')
+        name = os.path.basename(editor.file_path) if editor.file_path else "New file"
+        if diagnostics:
+            self.status_label.setText(f"{name}: {errors} errors, {len(diagnostics) - errors} warnings")
+        else:
+            self.status_label.setText(f"{name}: no problems")
+
+    def open_problem(self, item):
+        tab_widget = self.main_window.tab_widget
+        location = item.data(0, Qt.ItemDataRole.UserRole)
+        if location and tab_widget.indexOf(self.editor) >= 0:
+            tab_widget.setCurrentWidget(self.editor)
+            self.editor.go_to_line(*location)
+            self.editor.setFocus()
+
+class OutlinePanel(QWidget):
+    KIND_COLORS = {'class': "#4EC9B0", 'function': "#DCDCAA", 'method': "#DCDCAA"}
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.editor = None
+        self.symbols = None
+        self.items = []
+        self.starts = []
+        self.ends = []
+        self.parents = []
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.outline_tree = QTreeWidget()
+        self.outline_tree.setHeaderHidden(True)
+        self.outline_tree.itemActivated.connect(self.open_symbol)
+        self.outline_tree.itemClicked.connect(self.open_symbol)
+        layout.addWidget(self.outline_tree)
+
+    def attach_editor(self, editor):
+        if editor is self.editor:
+            return
+        tab_widget = self.main_window.tab_widget
+        if self.editor is not None and tab_widget.indexOf(self.editor) >= 0:
+            self.editor.cursorPositionChanged.disconnect(self.follow_cursor)
+        self.editor = editor
+        if editor is not None:
+            editor.cursorPositionChanged.connect(self.follow_cursor)
+
+    def show_outline(self, editor, symbols):
+        self.attach_editor(editor)
+        if symbols == self.symbols:
+            self.follow_cursor()
+            return
+        self.symbols = symbols
+        scroll = self.outline_tree.verticalScrollBar().value()
+        self.outline_tree.clear()
+        self.items, self.starts, self.ends, self.parents = [], [], [], []
+        stack = []
+        for line, end_line, depth, kind, name in symbols:
+            del stack[depth:]
+            parent = stack[-1] if stack else -1
+            item = QTreeWidgetItem([f'{name}()' if kind != 'class' else name])
+            item.setData(0, Qt.ItemDataRole.UserRole, line)
+            item.setForeground(0, QColor(self.KIND_COLORS[kind]))
+            if parent >= 0:
+                self.items[parent].addChild(item)
+            else:
+                self.outline_tree.addTopLevelItem(item)
+            stack.append(len(self.items))
+            self.items.append(item)
+            self.starts.append(line)
+            self.ends.append(end_line)
+            self.parents.append(parent)
+        self.outline_tree.expandAll()
+        self.outline_tree.verticalScrollBar().setValue(scroll)
+        self.follow_cursor()
+
+    def follow_cursor(self):
+        if self.editor is None or not self.items:
+            return
+        line = self.editor.textCursor().blockNumber() + 1
+        index = bisect_right(self.starts, line) - 1
+        while index >= 0 and self.ends[index] < line:
+            index = self.parents[index]
+        if index < 0:
+            self.outline_tree.clearSelection()
+            return
+        self.outline_tree.setCurrentItem(self.items[index])
+        self.outline_tree.scrollToItem(self.items[index])
+
+    def open_symbol(self, item):
+        line = item.data(0, Qt.ItemDataRole.UserRole)
+        if line and self.editor is not None and self.main_window.tab_widget.indexOf(self.editor) >= 0:
+            self.editor.go_to_line(line)
+            self.editor.setFocus()
+
+class TestPanel(QWidget):
+    OUTCOME_COLORS = {'passed': "#6A9955", 'failed': "#F14C4C", 'error': "#F14C4C", 'skipped': "#CCA700"}
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.items = {}
+        self.outcomes = {}
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        buttons = QHBoxLayout()
+        run_button = QPushButton("Run all")
+        run_button.clicked.connect(main_window.run_all_tests)
+        rerun_button = QPushButton("Rerun failed")
+        rerun_button.clicked.connect(main_window.rerun_failed_tests)
+        stop_button = QPushButton("Stop")
+        stop_button.clicked.connect(main_window.stop_tests)
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        for button in (run_button, rerun_button, stop_button):
+            buttons.addWidget(button)
+        buttons.addStretch()
+        buttons.addWidget(QLabel("Workers:"))
+        buttons.addWidget(self.workers_spin)
+        self.status_label = QLabel()
+        self.tests_tree = QTreeWidget()
+        self.tests_tree.setHeaderLabels(["Test", "Result", "Duration"])
+        self.tests_tree.itemActivated.connect(self.open_test)
+        layout.addLayout(buttons)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.tests_tree)
+
+    def show_tests(self, tests):
+        root = self.main_window.workspace_root
+        self.tests_tree.clear()
+        self.items = {}
+        for test_id, line, end_line in tests:
+            path, _, name = test_id.rpartition('::')
+            parent = self.items.get(path)
+            if parent is None:
+                parent = QTreeWidgetItem([path])
+                parent.setData(0, Qt.ItemDataRole.UserRole, (os.path.join(root, path), 1))
+                self.tests_tree.addTopLevelItem(parent)
+                self.items[path] = parent
+            item = QTreeWidgetItem([name])
+            item.setData(0, Qt.ItemDataRole.UserRole, (os.path.join(root, test_id.split('::', 1)[0]), line))
+            parent.addChild(item)
+            self.items[test_id] = item
+        for test_id, (outcome, duration, message) in list(self.outcomes.items()):
+            self.show_result(test_id, outcome, duration, message)
+        files = {test_id.split('::', 1)[0] for test_id, line, end_line in tests}
+        self.status_label.setText(f"{len(select_tests(tests, files))} tests discovered in {len(files)} files")
+
+    def begin(self, test_ids):
+        for test_id in test_ids:
+            self.outcomes.pop(test_id, None)
+            for result_id in [result_id for result_id in self.items if result_id.startswith(test_id + '[')]:
+                self.outcomes.pop(result_id, None)
+                del self.items[result_id]
+            item = self.items.get(test_id)
+            if item is not None:
+                item.setText(1, "")
+                item.setText(2, "")
+                item.setToolTip(0, "")
+                item.takeChildren()
+        self.update_status(f"Running {len(test_ids)} tests...")
+
+    def show_result(self, test_id, outcome, duration, message):
+        self.outcomes[test_id] = (outcome, duration, message)
+        item = self.items.get(test_id)
+        if item is None:
+            parent = self.items.get(test_id.split('[', 1)[0]) or self.items.get(test_id.split('::', 1)[0])
+            item = QTreeWidgetItem([test_id.rpartition('::')[2] if parent is not None else test_id])
+            if parent is not None:
+                item.setData(0, Qt.ItemDataRole.UserRole, parent.data(0, Qt.ItemDataRole.UserRole))
+                parent.addChild(item)
+            else:
+                self.tests_tree.addTopLevelItem(item)
+            self.items[test_id] = item
+        item.setText(1, outcome)
+        item.setText(2, f"{duration * 1000:.0f} ms")
+        item.setForeground(1, QColor(self.OUTCOME_COLORS.get(outcome, "#D4D4D4")))
+        item.setToolTip(0, message[-4000:])
+        if outcome in ('failed', 'error'):
+            parent = item.parent()
+            while parent is not None:
+                parent.setExpanded(True)
+                parent = parent.parent()
+
+    def add_result(self, test_id, outcome, duration, message):
+        self.show_result(test_id, outcome, duration, message)
+        self.update_status("Running...")
+
+    def finish(self, elapsed):
+        self.update_status(f"finished in {elapsed:.1f}s")
+
+    def update_status(self, suffix):
+        counts = {}
+        for outcome, duration, message in self.outcomes.values():
+            counts[outcome] = counts.get(outcome, 0) + 1
+        summary = ', '.join(f"{counts[outcome]} {outcome}" for outcome in ('passed', 'failed', 'error', 'skipped')
+                            if outcome in counts)
+        self.status_label.setText(f"{summary} - {suffix}" if summary else suffix)
+
+    def failed_ids(self):
+        return [test_id for test_id, (outcome, duration, message) in self.outcomes.items()
+                if outcome in ('failed', 'error')]
+
+    def open_test(self, item):
+        location = item.data(0, Qt.ItemDataRole.UserRole)
+        if location:
+            self.main_window.tab_widget.open_location(*location)
+
+class CodeEditor(QPlainTextEdit):
+    COMPLETION_DELAY = 150
+    COMPLETION_TIMEOUT = 2.0
+    BLOCK_OVERHEAD = 200
+    ANALYSIS_DELAY = 500
+    MAX_DIAGNOSTIC_SELECTIONS = 1000
+    DIAGNOSTIC_COLORS = {'error': "#F14C4C", 'warning': "#CCA700"}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFont(QFont("Cascadia Code", 12))
+        self.file_path = None
+        self.large_file = False
+        self.loader = None
+        self.pending_location = None
+        self.pending_scroll = None
+        self.last_active = time.monotonic()
+        self.extra_selection_groups = {}
+        self.text_index = None
+        self.diagnostics = []
+        self.outline = []
+        self.save_revision = None
+        self.highlighter = PythonHighlighter(self.document())
+        self.setStyleSheet("""
+            QPlainTextEdit {
+                background-color: #1E1E1E;
+                color: #D4D4D4;
+                border: 1px solid #3E3E3E;
+            }
+        """)
+        self.textChanged.connect(self.on_text_changed)
+        self.verticalScrollBar().valueChanged.connect(self.update_visible_blocks)
+        self.setup_completer()
+        self.setup_analysis()
+
+    def setup_analysis(self):
+        self.analysis_timer = QTimer(self)
+        self.analysis_timer.setSingleShot(True)
+        self.analysis_timer.setInterval(self.ANALYSIS_DELAY)
+        self.analysis_timer.timeout.connect(self.request_analysis)
+        DiagnosticsService.instance().diagnostics_ready.connect(self.on_diagnostics_ready)
+        OutlineService.instance().outline_ready.connect(self.on_outline_ready)
+
+    def request_analysis(self):
+        if self.large_file or (self.file_path and not self.file_path.endswith(('.py', '.pyw'))):
+            return
+        text = self.toPlainText()
+        revision = self.document().revision()
+        DiagnosticsService.instance().analyze(self, revision, text, self.file_path)
+        OutlineService.instance().request(self, revision, text)
+
+    def on_outline_ready(self, editor, revision, symbols):
+        if editor is self and revision == self.document().revision():
+            self.outline = symbols
+
+    def on_diagnostics_ready(self, editor, revision, diagnostics):
+        if editor is not self or revision != self.document().revision():
+            return
+        self.diagnostics = diagnostics
+        formats = {}
+        for severity, color in self.DIAGNOSTIC_COLORS.items():
+            formats[severity] = QTextCharFormat()
+            formats[severity].setUnderlineStyle(QTextCharFormat.UnderlineStyle.WaveUnderline)
+            formats[severity].setUnderlineColor(QColor(color))
+
+        document = self.document()
+        selections = []
+        for line, column, end_column, severity, message in diagnostics[:self.MAX_DIAGNOSTIC_SELECTIONS]:
+            block = document.findBlockByNumber(line - 1)
+            if not block.isValid():
+                continue
+            to_utf16 = utf16_position_mapper(block.text())
+            last = block.length() - 1
+            selection = QTextEdit.ExtraSelection()
+            selection.format = formats[severity]
+            selection.cursor = QTextCursor(document)
+            selection.cursor.setPosition(block.position() + min(to_utf16(column), last))
+            selection.cursor.setPosition(block.position() + min(to_utf16(end_column), last),
+                                         QTextCursor.MoveMode.KeepAnchor)
+            selections.append(selection)
+        self.set_extra_selections('diagnostics', selections)
+
+    def diagnostic_at(self, line, column):
+        for diagnostic_line, start, end, severity, message in self.diagnostics:
+            if diagnostic_line == line and start <= column <= end:
+                return message
+        return None
+
+    def viewportEvent(self, event):
+        if event.type() == QEvent.Type.ToolTip and self.diagnostics:
+            cursor = self.cursorForPosition(event.pos())
+            message = self.diagnostic_at(cursor.blockNumber() + 1, cursor.positionInBlock())
+            if message:
+                QToolTip.showText(event.globalPos(), message, self.viewport())
+                return True
+            QToolTip.hideText()
+        return super().viewportEvent(event)
+
+    def setup_completer(self):
+        self.completer = QCompleter(self)
+        self.completer.setWidget(self)
+        self.completer.setModel(QStringListModel(self.completer))
+        self.completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.completer.activated.connect(self.insert_completion)
+
+        self.completion_id = 0
+        self.completion_position = -1
+        self.completion_started = 0.0
+        self.typing = False
+        self.completion_timer = QTimer(self)
+        self.completion_timer.setSingleShot(True)
+        self.completion_timer.setInterval(self.COMPLETION_DELAY)
+        self.completion_timer.timeout.connect(self.request_completions)
+        self.cursorPositionChanged.connect(self.on_cursor_moved)
+        CompletionService.instance().completions_ready.connect(self.on_completions_ready)
+
+    def go_to_line(self, line, column=0):
+        block = self.document().findBlockByNumber(max(line - 1, 0))
+        if not block.isValid():
+            return
+        cursor = self.textCursor()
+        cursor.setPosition(block.position() + min(column, block.length() - 1))
+        self.setTextCursor(cursor)
+        self.centerCursor()
+
+    def view_state(self):
+        if self.pending_location:
+            return (*self.pending_location, self.pending_scroll or 0)
+        cursor = self.textCursor()
+        return cursor.blockNumber() + 1, cursor.positionInBlock(), self.verticalScrollBar().value()
+
+    def memory_estimate(self):
+        document = self.document()
+        return document.characterCount() * 2 + document.blockCount() * self.BLOCK_OVERHEAD
+
+    def apply_pending_location(self):
+        if self.pending_location:
+            self.go_to_line(*self.pending_location)
+            self.pending_location = None
+        if self.pending_scroll is not None:
+            self.verticalScrollBar().setValue(self.pending_scroll)
+            self.pending_scroll = None
+
+    def symbol_under_cursor(self):
+        cursor = self.textCursor()
+        text = cursor.block().text()
+        column = cursor.positionInBlock()
+        for match in re.finditer(r'[^\W\d]\w*', text):
+            if match.start() <= column <= match.end():
+                return match.group()
+        return None
+
+    def search_index(self):
+        if self.text_index is None:
+            self.text_index = SearchIndex(self.document(), self)
+            self.text_index.start()
+        return self.text_index
+
+    def set_extra_selections(self, kind, selections):
+        self.extra_selection_groups[kind] = selections
+        self.setExtraSelections([selection for group in self.extra_selection_groups.values()
+                                 for selection in group])
+
+    def word_before_cursor(self):
+        cursor = self.textCursor()
+        text = cursor.block().text()[:cursor.positionInBlock()]
+        match = re.search(r'\w*$', text)
+        return match.group()
+
+    def keyPressEvent(self, event):
+        popup = self.completer.popup()
+        if popup.isVisible() and event.key() in (Qt.Key.Key_Enter, Qt.Key.Key_Return, Qt.Key.Key_Escape,
+                                                 Qt.Key.Key_Tab, Qt.Key.Key_Backtab):
+            event.ignore()
+            return
+        if event.key() == Qt.Key.Key_Space and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.request_completions()
+            return
+
+        self.typing = True
+        super().keyPressEvent(event)
+        self.typing = False
+
+        text = event.text()
+        if self.large_file or not text:
+            return
+        if text.isalnum() or text in '._':
+            self.schedule_completions()
+        else:
+            self.cancel_completions()
+
+    def schedule_completions(self):
+        self.completion_id += 1
+        self.completion_position = self.textCursor().position()
+        self.completion_timer.start()
+        if self.completer.popup().isVisible():
+            self.completer.setCompletionPrefix(self.word_before_cursor())
+
+    def cancel_completions(self):
+        self.completion_id += 1
+        self.completion_timer.stop()
+        self.completer.popup().hide()
+
+    def on_cursor_moved(self):
+        if not self.typing and self.textCursor().position() != self.completion_position:
+            self.cancel_completions()
+
+    def request_completions(self):
+        if self.large_file:
+            return
+        cursor = self.textCursor()
+        self.completion_id += 1
+        self.completion_position = cursor.position()
+        self.completion_started = time.monotonic()
+        CompletionService.instance().request(self, self.completion_id, self.toPlainText(),
+                                             cursor.blockNumber() + 1, cursor.positionInBlock())
+
+    def on_completions_ready(self, editor, request_id, names):
+        if editor is not self or request_id != self.completion_id:
+            return
+        if time.monotonic() - self.completion_started > self.COMPLETION_TIMEOUT:
+            return
+        if not names or not self.hasFocus():
+            self.completer.popup().hide()
+            return
+        self.completer.model().setStringList(names)
+        self.completer.setCompletionPrefix(self.word_before_cursor())
+        self.completer.popup().setCurrentIndex(self.completer.completionModel().index(0, 0))
+        rect = self.cursorRect()
+        rect.setWidth(self.completer.popup().sizeHintForColumn(0)
+                      + self.completer.popup().verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+
+    def insert_completion(self, completion):
+        prefix = self.word_before_cursor()
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.KeepAnchor, len(prefix))
+        cursor.insertText(completion)
+        self.setTextCursor(cursor)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_visible_blocks()
+
+    def update_visible_blocks(self):
+        first_block = self.firstVisibleBlock()
+        last = self.cursorForPosition(self.viewport().rect().bottomLeft()).blockNumber()
+        if self.large_file:
+            if first_block.isValid():
+                self.highlighter.highlight_layouts(first_block, last)
+        else:
+            self.highlighter.set_visible_blocks(first_block.blockNumber(), last)
+
+    def enable_large_file_mode(self):
+        self.large_file = True
+        self.highlighter.setDocument(None)
+        self.textChanged.disconnect(self.on_text_changed)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setUndoRedoEnabled(False)
+        self.document().contentsChange.connect(self.on_large_contents_change)
+
+    def on_large_contents_change(self, position, removed, added):
+        block = self.document().findBlock(position)
+        last = self.document().findBlock(position + added)
+        while block.isValid():
+            if block.userState() < 0:
+                break
+            block.setUserState(-1)
+            if block == last:
+                break
+            block = block.next()
+        QTimer.singleShot(0, self.update_visible_blocks)
+        
+    def on_text_changed(self):
+        log_manager.count('edit', self.file_path or "New file")
+        self.analysis_timer.start()
+
+class FileLoader(QThread):
+    chunk_loaded = Signal(str)
+    progress = Signal(int, int)
+    failed = Signal(str)
+
+    CHUNK_SIZE = 256 * 1024
+    MAX_PENDING_CHUNKS = 4
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.pending = threading.Semaphore(self.MAX_PENDING_CHUNKS)
+
+    def run(self):
+        try:
+            total = os.path.getsize(self.file_path)
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                while not self.isInterruptionRequested():
+                    chunk = file.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    while not self.pending.acquire(timeout=0.1):
+                        if self.isInterruptionRequested():
+                            return
+                    self.chunk_loaded.emit(chunk)
+                    self.progress.emit(file.buffer.tell(), total)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def chunk_consumed(self):
+        self.pending.release()
+
+def current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+class FileIO(QObject):
+    NEW_FILE_MODE = 0o666 & ~current_umask()
+
+    read_finished = Signal(object, str)
+    read_failed = Signal(object, str)
+    save_finished = Signal(str)
+    save_failed = Signal(str, str)
+    diff_finished = Signal(object, str, list, object)
+    _saved = Signal(str, str)
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.pending_saves = {}
+        self._saved.connect(self.on_saved)
+
+    def read(self, file_path, context=None):
+        self.pool.start(lambda: self.read_worker(file_path, context))
+
+    def read_worker(self, file_path, context):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                content = file.read()
+        except Exception as e:
+            self.read_failed.emit(context, str(e))
+        else:
+            self.read_finished.emit(context, content)
+
+    def diff(self, file_path, text, context=None):
+        self.pool.start(lambda: self.diff_worker(file_path, text, context))
+
+    def diff_worker(self, file_path, text, context):
+        try:
+            signature = file_signature(file_path)
+            with open(file_path, 'r', encoding='utf-8') as file:
+                content = file.read()
+            edits = diff_text_edits(text, content)
+        except Exception as e:
+            log_manager.log('warning', f'Error reloading file {file_path}: {str(e)}')
+        else:
+            self.diff_finished.emit(context, text, edits, signature)
+
+    def save(self, file_path, content):
+        if file_path in self.pending_saves:
+            self.pending_saves[file_path] = content
+            return
+        self.pending_saves[file_path] = None
+        self.pool.start(lambda: self.save_worker(file_path, content))
+
+    def save_worker(self, file_path, content):
+        try:
+            self.write_atomic(file_path, content)
+        except Exception as e:
+            self._saved.emit(file_path, str(e))
+        else:
+            self._saved.emit(file_path, '')
+
+    def on_saved(self, file_path, error):
+        content = self.pending_saves.pop(file_path, None)
+        if content is not None:
+            self.save(file_path, content)
+        if error:
+            self.save_failed.emit(file_path, error)
+        else:
+            self.save_finished.emit(file_path)
+
+    @staticmethod
+    def write_atomic(file_path, content):
+        file_path = os.path.realpath(file_path)
+        directory = os.path.dirname(file_path)
+        fd, temp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(file_path)}.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+            if os.path.exists(file_path):
+                shutil.copymode(file_path, temp_path)
+            else:
+                os.chmod(temp_path, FileIO.NEW_FILE_MODE)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def wait_for_done(self):
+        while self.pending_saves or self.pool.activeThreadCount():
+            self.pool.waitForDone()
+            QApplication.processEvents()
+
+class PlaceholderTab(QWidget):
+    def __init__(self, file_path, line=1, column=0, scroll=0, parent=None, snapshot=None, modified=False):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.loader = None
+        self.line = line
+        self.column = column
+        self.scroll = scroll
+        self.snapshot = snapshot
+        self.modified = modified
+
+    def view_state(self):
+        return self.line, self.column, self.scroll
+
+    def memory_estimate(self):
+        return len(self.snapshot or b'')
+
+class TabWidget(QTabWidget):
+    LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
+    HIBERNATE_AFTER = 10 * 60
+    MEMORY_BUDGET = 256 * 1024 * 1024
+    HIBERNATE_CHECK_INTERVAL = 30000
+    RELOAD_DELAY = 200
+
+    def __init__(self, parent=None, large_file_threshold=None, hibernate_after=None, memory_budget=None):
+        super().__init__(parent)
+        self.large_file_threshold = large_file_threshold or self.LARGE_FILE_THRESHOLD
+        self.hibernate_after = hibernate_after or self.HIBERNATE_AFTER
+        self.memory_budget = memory_budget or self.MEMORY_BUDGET
+        self.active_editor = None
+        self.hibernate_timer = QTimer(self)
+        self.hibernate_timer.setInterval(self.HIBERNATE_CHECK_INTERVAL)
+        self.hibernate_timer.timeout.connect(self.check_hibernation)
+        self.hibernate_timer.start()
+        self.file_io = FileIO(self)
+        self.file_io.read_finished.connect(self.on_file_read)
+        self.file_io.read_failed.connect(self.on_file_read_failed)
+        self.file_io.diff_finished.connect(self.on_file_diff)
+        self.file_io.save_finished.connect(self.on_file_saved)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.disk_signatures = {}
+        self.changed_paths = set()
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(self.RELOAD_DELAY)
+        self.reload_timer.timeout.connect(self.reload_changed_files)
+        self.setTabsClosable(True)
+        self.setMovable(True)
+        self.tabCloseRequested.connect(self.close_tab)
+        self.currentChanged.connect(self.on_tab_changed)
+        
+    def create_new_tab(self, file_path=None, index=-1):
+        editor = CodeEditor(self)
+        if file_path and os.path.isfile(file_path) and os.path.getsize(file_path) > self.large_file_threshold:
+            return self.create_large_file_tab(editor, file_path, index)
+        if file_path:
+            editor.file_path = file_path
+            editor.setReadOnly(True)
+            self.file_io.read(file_path, editor)
+            tab_name = os.path.basename(file_path)
+        else:
+            tab_name = "New file"
             
-        index = self.addTab(editor, tab_name)
+        index = self.insertTab(index, editor, tab_name)
         self.setCurrentIndex(index)
         log_manager.log('info', 'A new tab has been created')
         return editor
+
+    def on_file_read(self, editor, content):
+        if self.indexOf(editor) < 0:
+            return
+        editor.setPlainText(content)
+        editor.setReadOnly(False)
+        editor.apply_pending_location()
+        self.watch(editor.file_path)
+
+    def watch(self, file_path):
+        file_path = os.path.abspath(file_path)
+        self.disk_signatures[file_path] = file_signature(file_path)
+        if file_path not in self.watcher.files() and os.path.exists(file_path):
+            self.watcher.addPath(file_path)
+
+    def sync_watched_files(self):
+        open_paths = {os.path.abspath(self.widget(index).file_path) for index in range(self.count())
+                      if getattr(self.widget(index), 'file_path', None)}
+        stale = [file_path for file_path in self.watcher.files() if file_path not in open_paths]
+        if stale:
+            self.watcher.removePaths(stale)
+        for file_path in stale:
+            self.disk_signatures.pop(file_path, None)
+
+    def tabRemoved(self, index):
+        super().tabRemoved(index)
+        self.sync_watched_files()
+
+    def on_file_saved(self, file_path):
+        self.watch(file_path)
+        self.sync_watched_files()
+
+    def on_file_changed(self, file_path):
+        self.changed_paths.add(file_path)
+        self.reload_timer.start()
+
+    def reload_changed_files(self):
+        changed_paths, self.changed_paths = self.changed_paths, set()
+        for file_path in changed_paths:
+            if os.path.exists(file_path) and file_path not in self.watcher.files():
+                self.watcher.addPath(file_path)
+            signature = file_signature(file_path)
+            if signature is not None and signature == self.disk_signatures.get(file_path):
+                continue
+            for index in range(self.count()):
+                editor = self.widget(index)
+                if (not isinstance(editor, CodeEditor) or not editor.file_path or editor.loader is not None
+                        or editor.isReadOnly() or os.path.abspath(editor.file_path) != file_path):
+                    continue
+                if signature is None:
+                    self.window().statusBar().showMessage(f"File {file_path} was deleted on disk")
+                elif editor.document().isModified():
+                    self.window().statusBar().showMessage(
+                        f"File {file_path} changed on disk; unsaved changes were kept")
+                else:
+                    self.file_io.diff(file_path, editor.toPlainText(), (editor, editor.document().revision()))
+
+    def on_file_diff(self, context, text, edits, signature):
+        editor, revision = context
+        if (self.indexOf(editor) < 0 or editor.document().revision() != revision
+                or editor.document().isModified()):
+            return
+        file_path = os.path.abspath(editor.file_path)
+        self.disk_signatures[file_path] = signature
+        if not edits:
+            return
+        scroll_bars = editor.verticalScrollBar(), editor.horizontalScrollBar()
+        positions = [scroll_bar.value() for scroll_bar in scroll_bars]
+        apply_text_edits(editor.document(), text, edits)
+        editor.document().setModified(False)
+        for scroll_bar, position in zip(scroll_bars, positions):
+            scroll_bar.setValue(position)
+        self.window().statusBar().showMessage(f"File {file_path} reloaded from disk")
+        log_manager.log('info', f'Reloaded {file_path} from disk: {len(edits)} changed hunks')
+
+    def add_placeholder(self, file_path, line=1, column=0, scroll=0):
+        placeholder = PlaceholderTab(file_path, line, column, scroll, self)
+        index = self.addTab(placeholder, os.path.basename(file_path))
+        self.setTabToolTip(index, file_path)
+        return placeholder
+
+    def materialize(self, index):
+        placeholder = self.widget(index)
+        title, tooltip = self.tabText(index), self.tabToolTip(index)
+        if placeholder.snapshot is not None:
+            editor = self.create_new_tab(None, index)
+            editor.file_path = placeholder.file_path
+            editor.setPlainText(zlib.decompress(placeholder.snapshot).decode('utf-8'))
+            editor.document().setModified(placeholder.modified)
+            if editor.file_path:
+                self.changed_paths.add(os.path.abspath(editor.file_path))
+                self.reload_timer.start()
+        else:
+            editor = self.create_new_tab(placeholder.file_path, index)
+        editor.pending_location = (placeholder.line, placeholder.column)
+        editor.pending_scroll = placeholder.scroll
+        if placeholder.snapshot is not None:
+            editor.apply_pending_location()
+        self.removeTab(self.indexOf(placeholder))
+        self.setTabText(self.indexOf(editor), title)
+        self.setTabToolTip(self.indexOf(editor), tooltip)
+        placeholder.deleteLater()
+        return editor
+
+    def can_hibernate(self, editor):
+        return (isinstance(editor, CodeEditor) and editor is not self.currentWidget()
+                and editor.loader is None and not editor.isReadOnly()
+                and not (editor.large_file and editor.document().isModified()))
+
+    def hibernate(self, index):
+        editor = self.widget(index)
+        line, column, scroll = editor.view_state()
+        modified = editor.document().isModified()
+        snapshot = None
+        if modified or not editor.file_path or not os.path.isfile(editor.file_path):
+            snapshot = zlib.compress(editor.toPlainText().encode('utf-8'), 1)
+        placeholder = PlaceholderTab(editor.file_path, line, column, scroll, self, snapshot, modified)
+        title, tooltip = self.tabText(index), self.tabToolTip(index)
+        self.blockSignals(True)
+        self.insertTab(index, placeholder, title)
+        self.setTabToolTip(index, tooltip)
+        self.removeTab(index + 1)
+        self.blockSignals(False)
+        CompletionService.instance().forget(editor)
+        DiagnosticsService.instance().forget(editor)
+        editor.deleteLater()
+        log_manager.log('info', f'Tab hibernated: {editor.file_path or title}')
+
+    def memory_estimate(self):
+        return sum(self.widget(index).memory_estimate() for index in range(self.count()))
+
+    def check_hibernation(self):
+        now = time.monotonic()
+        total = self.memory_estimate()
+        candidates = sorted((self.widget(index) for index in range(self.count())
+                             if self.can_hibernate(self.widget(index))), key=lambda editor: editor.last_active)
+        for editor in candidates:
+            if now - editor.last_active < self.hibernate_after and total <= self.memory_budget:
+                break
+            total -= editor.memory_estimate()
+            self.hibernate(self.indexOf(editor))
+
+    def find_editor(self, file_path):
+        file_path = os.path.abspath(file_path)
+        for index in range(self.count()):
+            editor = self.widget(index)
+            if editor.file_path and os.path.abspath(editor.file_path) == file_path:
+                if isinstance(editor, PlaceholderTab):
+                    editor = self.materialize(index)
+                return editor
+        return None
+
+    def open_file(self, file_path):
+        editor = self.find_editor(file_path)
+        if editor:
+            self.setCurrentWidget(editor)
+            return editor
+        return self.create_new_tab(file_path)
+
+    def open_location(self, file_path, line, column=0):
+        editor = self.find_editor(file_path)
+        if editor:
+            self.setCurrentWidget(editor)
+            if editor.isReadOnly() and not editor.toPlainText():
+                editor.pending_location = (line, column)
+                editor.pending_scroll = None
+            else:
+                editor.go_to_line(line, column)
+            return editor
+        editor = self.create_new_tab(file_path)
+        if editor:
+            editor.pending_location = (line, column)
+        return editor
+
+    def on_file_read_failed(self, editor, error):
+        log_manager.log('error', f'Error opening file {editor.file_path}: {error}')
+        self.window().statusBar().showMessage(f"Failed to open file {editor.file_path}: {error}")
+        index = self.indexOf(editor)
+        if index >= 0:
+            self.close_tab(index)
+
+    def create_large_file_tab(self, editor, file_path, index=-1):
+        editor.file_path = file_path
+        editor.enable_large_file_mode()
+        editor.setReadOnly(True)
+
+        loader = FileLoader(file_path, self)
+        editor.loader = loader
+        loader.chunk_loaded.connect(lambda chunk: self.append_chunk(editor, chunk))
+        loader.progress.connect(lambda done, total: self.show_load_progress(file_path, done, total))
+        loader.failed.connect(lambda error: log_manager.log('error', f'Error opening file {file_path}: {error}'))
+        loader.finished.connect(lambda: self.finish_large_file_load(editor))
+
+        index = self.insertTab(index, editor, os.path.basename(file_path))
+        self.setCurrentIndex(index)
+        log_manager.log('info', f'Loading large file in the background: {file_path}')
+        loader.start()
+        return editor
+
+    def append_chunk(self, editor, chunk):
+        cursor = QTextCursor(editor.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(chunk)
+        editor.loader.chunk_consumed()
+        if editor.document().blockCount() < editor.highlighter.VISIBLE_BLOCKS * 2:
+            editor.update_visible_blocks()
+
+    def show_load_progress(self, file_path, done, total):
+        percent = done * 100 // total if total else 100
+        self.window().statusBar().showMessage(f"Loading {os.path.basename(file_path)}: {percent}%")
+
+    def finish_large_file_load(self, editor):
+        editor.loader.deleteLater()
+        editor.loader = None
+        editor.setReadOnly(False)
+        editor.setUndoRedoEnabled(True)
+        editor.document().setModified(False)
+        editor.update_visible_blocks()
+        editor.apply_pending_location()
+        self.watch(editor.file_path)
+        self.window().statusBar().showMessage(f"File {editor.file_path} opened (large file mode)")
+        log_manager.log('info', f'Large file loaded: {editor.file_path}')
         
     def close_tab(self, index):
         widget = self.widget(index)
+        if widget.loader is not None:
+            widget.loader.requestInterruption()
+        CompletionService.instance().forget(widget)
+        DiagnosticsService.instance().forget(widget)
         if widget.file_path and os.path.exists(widget.file_path):
             log_manager.log('info', f'The tab with the file is closed: {widget.file_path}')
         self.removeTab(index)
@@ -404,14 +3446,1044 @@ class TabWidget(QTabWidget):
     def on_tab_changed(self, index):
         if index >= 0:
             editor = self.widget(index)
+            if isinstance(editor, PlaceholderTab):
+                self.materialize(index)
+                return
+            now = time.monotonic()
+            if self.active_editor is not None and self.indexOf(self.active_editor) >= 0:
+                self.active_editor.last_active = now
+            editor.last_active = now
+            self.active_editor = editor
             if editor.file_path:
                 log_manager.log('info', f'Switch to tab: {editor.file_path}')
             else:
-                log_manager.log('info', 'Switch to a new tab')
+                log_manager.log('info', 'Switch to a new tab')
+
+class OutputPump(QObject):
+    FRAME_INTERVAL = 33
+    MAX_LINES = 10000
+    MAX_SPILL_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, widget, max_lines=None, parent=None):
+        super().__init__(parent or widget)
+        self.widget = widget
+        self.max_lines = max_lines or self.MAX_LINES
+        widget.setUndoRedoEnabled(False)
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.pending = []
+        self.spill = tempfile.TemporaryFile()
+        self.previous_spill = None
+        self.dropped_bytes = 0
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.FRAME_INTERVAL)
+        self.timer.timeout.connect(self.flush)
+
+    def feed(self, data: bytes):
+        if self.spill.tell() + len(data) > self.MAX_SPILL_BYTES // 2:
+            self.rotate_spill()
+        self.spill.write(data)
+        text = self.decoder.decode(data)
+        if text:
+            self.pending.append(text)
+            if not self.timer.isActive():
+                self.timer.start()
+
+    def write(self, text: str):
+        self.feed(text.encode('utf-8'))
+
+    def rotate_spill(self):
+        if self.previous_spill is not None:
+            self.previous_spill.seek(0, os.SEEK_END)
+            self.dropped_bytes += self.previous_spill.tell()
+            self.previous_spill.close()
+        self.previous_spill, self.spill = self.spill, tempfile.TemporaryFile()
+
+    def flush(self):
+        if not self.pending:
+            self.timer.stop()
+            return
+        text = ''.join(self.pending)
+        self.pending = []
+
+        index = len(text)
+        for _ in range(self.max_lines):
+            index = text.rfind('\n', 0, index)
+            if index < 0:
+                break
+        if index > 0:
+            text = text[index + 1:]
+
+        started = time.perf_counter()
+        scroll_bar = self.widget.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+        document = self.widget.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+
+        excess = document.blockCount() - self.max_lines
+        if excess > 0:
+            cursor.movePosition(QTextCursor.MoveOperation.Start)
+            cursor.setPosition(document.findBlockByNumber(excess).position(), QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+        elapsed = int((time.perf_counter() - started) * 1000)
+        self.timer.setInterval(max(self.FRAME_INTERVAL, elapsed * 2))
+
+    def finish(self):
+        text = self.decoder.decode(b'', final=True)
+        if text:
+            self.pending.append(text)
+        self.flush()
+
+    def clear(self):
+        self.timer.stop()
+        self.pending = []
+        self.decoder.reset()
+        self.spill.seek(0)
+        self.spill.truncate()
+        if self.previous_spill is not None:
+            self.previous_spill.close()
+            self.previous_spill = None
+        self.dropped_bytes = 0
+        self.widget.clear()
+
+    def save_to(self, file_path):
+        with open(file_path, 'wb') as file:
+            if self.dropped_bytes:
+                file.write(f'[{self.dropped_bytes} bytes of earlier output were discarded]\n'.encode('utf-8'))
+            for spill in (self.previous_spill, self.spill):
+                if spill is None:
+                    continue
+                spill.flush()
+                position = spill.tell()
+                spill.seek(0)
+                shutil.copyfileobj(spill, file)
+                spill.seek(position)
+
+FORK_SERVER_SOURCE = r"""
+import importlib, io, json, os, runpy, socket, sys, threading, traceback
+
+events = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+os.dup2(2, 1)
+lock = threading.Lock()
+
+def send(**event):
+    with lock:
+        events.write(json.dumps(event) + '\n')
+        events.flush()
+
+def reap(pid, run_id):
+    _, status = os.waitpid(pid, 0)
+    code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    send(event='exit', run=run_id, code=code)
+
+def run_child(request):
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(request['socket'])
+    null = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null, 0)
+    os.dup2(connection.fileno(), 1)
+    os.dup2(connection.fileno(), 2)
+    os.close(events.fileno())
+    sys.stdin = open(0, 'r', closefd=False)
+    sys.stdout = io.TextIOWrapper(io.FileIO(1, 'w', closefd=False), line_buffering=True)
+    sys.stderr = io.TextIOWrapper(io.FileIO(2, 'w', closefd=False), line_buffering=True)
+    os.chdir(request['cwd'])
+    sys.argv = [request['path']]
+    sys.path[0] = os.path.dirname(request['path'])
+    code = 0
+    try:
+        runpy.run_path(request['path'], run_name='__main__')
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if not isinstance(e.code, (int, type(None))):
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except Exception as e:
+        send(event='import_error', module=name, error=str(e))
+send(event='ready')
+
+for line in sys.stdin:
+    request = json.loads(line)
+    pid = os.fork()
+    if pid == 0:
+        run_child(request)
+    send(event='started', run=request['run'], pid=pid)
+    threading.Thread(target=reap, args=(pid, request['run']), daemon=True).start()
+"""
+
+class WarmInterpreter(QObject):
+    ready_changed = Signal(bool)
+    run_started = Signal(int, int)
+    run_finished = Signal(int, int)
+
+    def __init__(self, modules=None, parent=None):
+        super().__init__(parent)
+        if modules is None:
+            modules = [name.strip() for name in os.environ.get('FAYE_IDE_PRELOAD_MODULES', '').split(',')
+                       if name.strip()]
+        self.modules = modules
+        self.process = None
+        self.ready = False
+        self.buffer = b''
+        self.next_run_id = 0
+        self.runs = {}
+
+    @staticmethod
+    def is_supported():
+        return hasattr(os, 'fork')
+
+    def start(self):
+        if self.process is not None or not self.is_supported():
+            return
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.ForwardedErrorChannel)
+        self.process.readyReadStandardOutput.connect(self.read_events)
+        self.process.finished.connect(self.on_server_finished)
+        self.process.start(sys.executable, ['-u', '-c', FORK_SERVER_SOURCE] + self.modules)
+        log_manager.log('info', f'Starting warm interpreter with modules: {", ".join(self.modules) or "none"}')
+
+    def stop(self):
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        process.finished.disconnect(self.on_server_finished)
+        process.kill()
+        process.waitForFinished(1000)
+        self.set_ready(False)
+
+    def set_ready(self, ready):
+        if ready != self.ready:
+            self.ready = ready
+            self.ready_changed.emit(ready)
+
+    def run(self, file_path, pump):
+        self.next_run_id += 1
+        run_id = self.next_run_id
+        server = QLocalServer(self)
+        name = os.path.join(tempfile.gettempdir(), f'faye-ide-run-{os.getpid()}-{run_id}')
+        QLocalServer.removeServer(name)
+        if not server.listen(name):
+            raise OSError(server.errorString())
+        server.newConnection.connect(lambda: self.on_connection(run_id))
+        self.runs[run_id] = {'server': server, 'pump': pump, 'pid': None, 'code': None, 'closed': False}
+
+        request = {'run': run_id, 'path': os.path.abspath(file_path),
+                   'cwd': os.path.dirname(os.path.abspath(file_path)), 'socket': server.fullServerName()}
+        self.process.write((json.dumps(request) + '\n').encode('utf-8'))
+        return run_id
+
+    def on_connection(self, run_id):
+        run = self.runs.get(run_id)
+        if run is None:
+            return
+        socket = run['server'].nextPendingConnection()
+        run['server'].close()
+        run['socket'] = socket
+        socket.readyRead.connect(lambda: run['pump'].feed(socket.readAll().data()))
+        socket.disconnected.connect(lambda: self.on_output_closed(run_id))
+
+    def on_output_closed(self, run_id):
+        run = self.runs.get(run_id)
+        if run is None:
+            return
+        run['pump'].feed(run['socket'].readAll().data())
+        run['closed'] = True
+        self.finish_run(run_id)
+
+    def read_events(self):
+        self.buffer += self.process.readAllStandardOutput().data()
+        *lines, self.buffer = self.buffer.split(b'\n')
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                log_manager.log('warning', f'Warm interpreter sent an invalid event: {line[:200]!r}')
+                continue
+            if event['event'] == 'ready':
+                self.set_ready(True)
+                log_manager.log('info', 'Warm interpreter is ready')
+            elif event['event'] == 'import_error':
+                log_manager.log('warning', f'Warm interpreter failed to import {event["module"]}: {event["error"]}')
+            elif event['event'] == 'started' and event['run'] in self.runs:
+                self.runs[event['run']]['pid'] = event['pid']
+                self.run_started.emit(event['run'], event['pid'])
+            elif event['event'] == 'exit' and event['run'] in self.runs:
+                self.runs[event['run']]['code'] = event['code']
+                self.finish_run(event['run'])
+
+    def finish_run(self, run_id):
+        run = self.runs[run_id]
+        if run['code'] is None or not run['closed'] and 'socket' in run:
+            return
+        del self.runs[run_id]
+        run['server'].close()
+        run['pump'].finish()
+        self.run_finished.emit(run_id, run['code'])
+
+    def kill(self, run_id, sig=None):
+        run = self.runs.get(run_id)
+        if run and run['pid']:
+            try:
+                os.kill(run['pid'], sig or signal.SIGKILL)
+            except OSError:
+                pass
+
+    def on_server_finished(self):
+        self.process = None
+        self.set_ready(False)
+        for run_id, run in list(self.runs.items()):
+            run['code'] = -1
+            run['closed'] = True
+            self.finish_run(run_id)
+        log_manager.log('warning', 'Warm interpreter exited')
+
+FORMATTER_SERVER_SOURCE = r"""
+import json, os, shlex, shutil, subprocess, sys
+
+events = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+os.dup2(2, 1)
+
+def send(**event):
+    events.write(json.dumps(event) + '\n')
+    events.flush()
+
+def format_builtin(source, path):
+    lines = [line.rstrip() for line in source.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    return '\n'.join(lines) + '\n' if lines else ''
+
+def load_formatter(spec):
+    if spec in ('auto', 'black'):
+        try:
+            import black
+        except ImportError:
+            if spec == 'black':
+                raise
+        else:
+            mode = black.Mode()
+            def format_black(source, path):
+                try:
+                    return black.format_file_contents(source, fast=True, mode=mode)
+                except black.NothingChanged:
+                    return source
+            return 'black', format_black
+    if spec == 'auto' and shutil.which('ruff'):
+        spec = 'ruff format -'
+    if spec in ('auto', 'builtin'):
+        return 'builtin', format_builtin
+    command = shlex.split(spec)
+    def format_command(source, path):
+        completed = subprocess.run(command, input=source.encode('utf-8'), capture_output=True,
+                                   cwd=os.path.dirname(path) if path else None)
+        if completed.returncode != 0:
+            error = completed.stderr.decode('utf-8', 'replace').strip()
+            raise RuntimeError(error or f'exit code {completed.returncode}')
+        return completed.stdout.decode('utf-8')
+    return os.path.basename(command[0]), format_command
+
+try:
+    name, formatter = load_formatter(sys.argv[1])
+except Exception as e:
+    send(event='error', error=f'{type(e).__name__}: {e}')
+    sys.exit(1)
+send(event='ready', formatter=name)
+for line in sys.stdin:
+    request = json.loads(line)
+    try:
+        send(event='formatted', id=request['id'], text=formatter(request['source'], request['path']))
+    except Exception as e:
+        send(event='failed', id=request['id'], error=f'{type(e).__name__}: {e}')
+"""
+
+class Formatter(QObject):
+    formatted = Signal(object, str, list, str)
+
+    def __init__(self, spec=None, parent=None):
+        super().__init__(parent)
+        self.spec = spec or os.environ.get('FAYE_IDE_FORMATTER', 'auto')
+        self.process = None
+        self.ready = False
+        self.name = None
+        self.buffer = b''
+        self.next_request_id = 0
+        self.requests = {}
+        self.backlog = []
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    def start(self):
+        if self.process is not None:
+            return
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.ForwardedErrorChannel)
+        self.process.readyReadStandardOutput.connect(self.read_events)
+        self.process.finished.connect(self.on_server_finished)
+        self.process.start(sys.executable, ['-u', '-c', FORMATTER_SERVER_SOURCE, self.spec])
+        log_manager.log('info', f'Starting formatter: {self.spec}')
+
+    def stop(self):
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        process.finished.disconnect(self.on_server_finished)
+        process.kill()
+        process.waitForFinished(1000)
+        self.ready = False
+        self.fail_requests('formatter stopped')
+
+    def format(self, text, file_path, context=None):
+        self.start()
+        self.next_request_id += 1
+        self.requests[self.next_request_id] = (context, text)
+        request = json.dumps({'id': self.next_request_id, 'source': text,
+                              'path': os.path.abspath(file_path) if file_path else None})
+        if self.ready:
+            self.process.write((request + '\n').encode('utf-8'))
+        else:
+            self.backlog.append(request)
+
+    def read_events(self):
+        self.buffer += self.process.readAllStandardOutput().data()
+        *lines, self.buffer = self.buffer.split(b'\n')
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                log_manager.log('warning', f'Formatter sent an invalid event: {line[:200]!r}')
+                continue
+            if event['event'] == 'ready':
+                self.ready = True
+                self.name = event['formatter']
+                log_manager.log('info', f'Formatter is ready: {self.name}')
+                for request in self.backlog:
+                    self.process.write((request + '\n').encode('utf-8'))
+                self.backlog = []
+            elif event['event'] == 'error':
+                log_manager.log('warning', f'Formatter failed to start: {event["error"]}')
+            elif event['event'] in ('formatted', 'failed') and event['id'] in self.requests:
+                context, text = self.requests.pop(event['id'])
+                if event['event'] == 'failed':
+                    self.formatted.emit(context, text, [], event['error'])
+                else:
+                    self.pool.start(lambda context=context, text=text, new_text=event['text']:
+                                    self.formatted.emit(context, text, diff_text_edits(text, new_text), ''))
+
+    def fail_requests(self, error):
+        requests, self.requests, self.backlog = self.requests, {}, []
+        for context, text in requests.values():
+            self.formatted.emit(context, text, [], error)
+
+    def on_server_finished(self):
+        self.process = None
+        self.ready = False
+        self.fail_requests('formatter exited')
+        log_manager.log('warning', 'Formatter exited')
+
+TEST_FILE_PATTERNS = ('test_*.py', '*_test.py')
+DEFAULT_TEST_DURATION = 0.05
+
+def is_test_file(file_path):
+    name = os.path.basename(file_path)
+    return any(fnmatch.fnmatch(name, pattern) for pattern in TEST_FILE_PATTERNS)
+
+def discover_tests(source, relative_path):
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    tests = []
+    test_kinds = (ast.FunctionDef, ast.AsyncFunctionDef)
+    for node in tree.body:
+        if isinstance(node, test_kinds) and node.name.startswith('test'):
+            tests.append((f'{relative_path}::{node.name}', node.lineno, node.end_lineno))
+        elif isinstance(node, ast.ClassDef) and (node.name.startswith('Test') or any(
+                (getattr(base, 'id', None) or getattr(base, 'attr', '')).endswith('TestCase') for base in node.bases)):
+            methods = [(f'{relative_path}::{node.name}::{child.name}', child.lineno, child.end_lineno)
+                       for child in node.body if isinstance(child, test_kinds) and child.name.startswith('test')]
+            if methods:
+                tests.append((f'{relative_path}::{node.name}', node.lineno, node.end_lineno))
+                tests.extend(methods)
+    return tests
+
+def select_tests(tests, prefixes):
+    ids = [test[0] for test in tests]
+    containers = {test_id.rsplit('::', 1)[0] for test_id in ids}
+    return [test_id for test_id in ids if test_id not in containers and any(
+        test_id == prefix or test_id.startswith(prefix + '::') for prefix in prefixes)]
+
+def schedule_shards(test_ids, durations, count):
+    totals = {}
+    for test_id, duration in durations.items():
+        base = test_id.split('[', 1)[0]
+        totals[base] = totals.get(base, 0.0) + duration
+    files = {}
+    for test_id in test_ids:
+        files.setdefault(test_id.split('::', 1)[0], []).append(test_id)
+    units = list(files.values()) if len(files) >= count else [[test_id] for test_id in test_ids]
+    units.sort(key=lambda unit: -sum(totals.get(test_id, DEFAULT_TEST_DURATION) for test_id in unit))
+    shards = [(0.0, index, []) for index in range(min(count, len(units)))]
+    for unit in units:
+        total, index, shard = heapq.heappop(shards)
+        shard.extend(unit)
+        heapq.heappush(shards, (total + sum(totals.get(test_id, DEFAULT_TEST_DURATION) for test_id in unit),
+                                index, shard))
+    return [shard for total, index, shard in sorted(shards, reverse=True)]
+
+TEST_WORKER_SOURCE = r"""
+import json, os, sys, time, traceback
+
+events = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+os.dup2(2, 1)
+
+def send(**event):
+    events.write(json.dumps(event) + '\n')
+    events.flush()
+
+def run_pytest(pytest):
+    class Reporter:
+        def __init__(self):
+            self.reports = {}
+
+        def pytest_collectreport(self, report):
+            if report.failed:
+                send(event='result', id=report.nodeid, outcome='error', duration=0.0, message=str(report.longrepr))
+
+        def pytest_runtest_logreport(self, report):
+            duration, outcome, message = self.reports.pop(report.nodeid, (0.0, 'passed', ''))
+            duration += report.duration
+            if report.failed:
+                outcome, message = 'failed' if report.when == 'call' else 'error', str(report.longrepr)
+            elif report.skipped and outcome == 'passed':
+                reason = report.longrepr[2] if isinstance(report.longrepr, tuple) else str(report.longrepr)
+                outcome, message = 'skipped', reason
+            if report.when == 'teardown':
+                send(event='result', id=report.nodeid, outcome=outcome, duration=duration, message=message)
+            else:
+                self.reports[report.nodeid] = (duration, outcome, message)
+
+    pytest.main(['-q', '-p', 'no:cacheprovider', '--rootdir', root] + test_ids, plugins=[Reporter()])
+
+def run_unittest():
+    import importlib.util, unittest
+    modules = {}
+    for test_id in test_ids:
+        path, *names = test_id.split('::')
+        started = time.perf_counter()
+        outcome, message = 'passed', ''
+        try:
+            if path not in modules:
+                name = os.path.splitext(path)[0].replace(os.sep, '.').replace('/', '.')
+                spec = importlib.util.spec_from_file_location(name, os.path.join(root, path))
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[name] = module
+                spec.loader.exec_module(module)
+                modules[path] = module
+            target = modules[path]
+            for name in names[:-1]:
+                target = getattr(target, name)
+            if isinstance(target, type) and issubclass(target, unittest.TestCase):
+                result = unittest.TestResult()
+                target(names[-1]).run(result)
+                if result.errors or result.failures:
+                    outcome = 'error' if result.errors else 'failed'
+                    message = (result.errors or result.failures)[0][1]
+                elif result.skipped:
+                    outcome, message = 'skipped', result.skipped[0][1]
+            else:
+                getattr(target() if names[:-1] else target, names[-1])()
+        except AssertionError:
+            outcome, message = 'failed', traceback.format_exc()
+        except Exception:
+            outcome, message = 'error', traceback.format_exc()
+        send(event='result', id=test_id, outcome=outcome, duration=time.perf_counter() - started, message=message)
+
+root = sys.argv[1]
+test_ids = json.loads(sys.stdin.readline())
+os.chdir(root)
+sys.path.insert(0, root)
+try:
+    import pytest
+except ImportError:
+    run_unittest()
+else:
+    run_pytest(pytest)
+send(event='done')
+"""
+
+class TestRunner(QObject):
+    discovered = Signal(list)
+    result_ready = Signal(str, str, float, str)
+    run_finished = Signal(float)
+
+    def __init__(self, root, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.tests = []
+        self.durations = self.load_durations()
+        self.processes = {}
+        self.started = 0.0
+
+    def durations_path(self):
+        digest = hashlib.sha1(os.path.abspath(self.root).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(os.path.expanduser('~'), '.faye_ide', 'tests', f'{digest}.json')
+
+    def load_durations(self):
+        try:
+            with open(self.durations_path(), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def save_durations(self):
+        try:
+            os.makedirs(os.path.dirname(self.durations_path()), exist_ok=True)
+            FileIO.write_atomic(self.durations_path(), json.dumps(self.durations))
+        except OSError as e:
+            log_manager.log('error', f'Error saving test durations: {str(e)}')
+
+    def discover(self):
+        threading.Thread(target=self.discover_worker, daemon=True).start()
+
+    def discover_worker(self):
+        tests = []
+        for file_path, _ in iter_workspace_files(self.root, '.py', load_ignore_patterns(self.root)):
+            if not is_test_file(file_path):
+                continue
+            try:
+                with open(file_path, 'r', encoding='utf-8') as file:
+                    source = file.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+            relative_path = os.path.relpath(file_path, self.root).replace(os.sep, '/')
+            tests.extend(discover_tests(source, relative_path))
+        tests.sort()
+        self.discovered.emit(tests)
+
+    def is_running(self):
+        return bool(self.processes)
+
+    def run(self, test_ids, workers):
+        self.stop()
+        self.started = time.perf_counter()
+        shards = schedule_shards(test_ids, self.durations, max(1, workers))
+        for shard in shards:
+            process = QProcess(self)
+            process.setWorkingDirectory(self.root)
+            self.processes[process] = {'tests': set(shard), 'buffer': b'', 'errors': deque(maxlen=50)}
+            process.readyReadStandardOutput.connect(lambda process=process: self.read_events(process))
+            process.readyReadStandardError.connect(lambda process=process: self.read_errors(process))
+            process.finished.connect(lambda exit_code, exit_status, process=process:
+                                     self.on_worker_finished(process, exit_code))
+            process.start(sys.executable, ['-u', '-c', TEST_WORKER_SOURCE, self.root])
+            process.write((json.dumps(shard) + '\n').encode('utf-8'))
+            process.closeWriteChannel()
+        log_manager.log('info', f'Running {len(test_ids)} tests in {len(shards)} workers')
+
+    def read_events(self, process):
+        worker = self.processes.get(process)
+        if worker is None:
+            return
+        worker['buffer'] += process.readAllStandardOutput().data()
+        *lines, worker['buffer'] = worker['buffer'].split(b'\n')
+        for line in lines:
+            event = json.loads(line)
+            if event['event'] == 'result':
+                worker['tests'].difference_update((event['id'], event['id'].split('[', 1)[0]))
+                self.durations[event['id']] = event['duration']
+                self.result_ready.emit(event['id'], event['outcome'], event['duration'], event['message'])
+
+    def read_errors(self, process):
+        worker = self.processes.get(process)
+        if worker is not None:
+            worker['errors'].extend(process.readAllStandardError().data().decode('utf-8', 'replace').splitlines())
+
+    def on_worker_finished(self, process, exit_code):
+        if process not in self.processes:
+            return
+        self.read_events(process)
+        worker = self.processes.pop(process)
+        message = f'Test worker exited with code {exit_code}\n' + '\n'.join(worker['errors'])
+        for test_id in sorted(worker['tests']):
+            self.result_ready.emit(test_id, 'error', 0.0, message)
+        process.deleteLater()
+        if not self.processes:
+            self.save_durations()
+            self.run_finished.emit(time.perf_counter() - self.started)
+
+    def stop(self):
+        processes, self.processes = self.processes, {}
+        for process in processes:
+            process.kill()
+            process.waitForFinished(1000)
+            process.deleteLater()
+        if processes:
+            self.save_durations()
+
+PROFILE_RUNNER_SOURCE = r"""
+import cProfile, json, os, runpy, sys, tracemalloc
+
+stats_path, trace_memory, script = sys.argv[1], sys.argv[2] == '1', sys.argv[3]
+sys.argv = sys.argv[3:]
+sys.path[0] = os.path.dirname(os.path.abspath(script))
+if trace_memory:
+    tracemalloc.start()
+profiler = cProfile.Profile()
+namespace = None
+try:
+    namespace = profiler.runcall(runpy.run_path, script, run_name='__main__')
+finally:
+    profiler.dump_stats(stats_path)
+    if trace_memory:
+        statistics = tracemalloc.take_snapshot().statistics('lineno')
+        tracemalloc.stop()
+        ignored = ('<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', tracemalloc.__file__)
+        statistics = [s for s in statistics if s.traceback[0].filename not in ignored]
+        with open(stats_path + '.allocations', 'w') as file:
+            json.dump([(s.traceback[0].filename, s.traceback[0].lineno, s.size, s.count)
+                       for s in statistics[:500]], file)
+"""
+
+class SortableTreeItem(QTreeWidgetItem):
+    def __lt__(self, other):
+        column = self.treeWidget().sortColumn()
+        key, other_key = self.data(column, Qt.ItemDataRole.UserRole + 1), other.data(column, Qt.ItemDataRole.UserRole + 1)
+        if key is not None and other_key is not None:
+            return key < other_key
+        return self.text(column).lower() < other.text(column).lower()
+
+class ProfileReport(QWidget):
+    MAX_ROWS = 2000
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.status_label = QLabel("No profile yet")
+        self.tabs = QTabWidget()
+        self.functions_tree = self.create_tree(["Function", "Location", "Calls", "Self (s)", "Cumulative (s)"])
+        self.allocations_tree = self.create_tree(["Location", "Size (KB)", "Blocks"])
+        self.tabs.addTab(self.functions_tree, "Functions")
+        self.tabs.addTab(self.allocations_tree, "Allocations")
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.tabs)
+
+    def create_tree(self, headers):
+        tree = QTreeWidget()
+        tree.setHeaderLabels(headers)
+        tree.setRootIsDecorated(False)
+        tree.setSortingEnabled(True)
+        tree.itemActivated.connect(self.open_location)
+        return tree
+
+    def add_row(self, tree, values, location):
+        item = SortableTreeItem([value if isinstance(value, str) else text for value, text in values])
+        for column, (value, text) in enumerate(values):
+            if not isinstance(value, str):
+                item.setData(column, Qt.ItemDataRole.UserRole + 1, value)
+                item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        item.setData(0, Qt.ItemDataRole.UserRole, location)
+        tree.addTopLevelItem(item)
+
+    def load(self, file_path, stats_path):
+        stats = pstats.Stats(stats_path).stats
+        rows = sorted(stats.items(), key=lambda entry: entry[1][3], reverse=True)[:self.MAX_ROWS]
+        total = max((entry[1][3] for entry in rows), default=0.0)
+
+        self.functions_tree.setSortingEnabled(False)
+        self.functions_tree.clear()
+        for (path, line, function), (primitive_calls, calls, self_time, cumulative_time, callers) in rows:
+            location = (path, line) if line and os.path.isfile(path) else None
+            call_text = str(calls) if calls == primitive_calls else f"{calls}/{primitive_calls}"
+            self.add_row(self.functions_tree, [
+                (function, function),
+                (f"{os.path.basename(path)}:{line}" if line else path, None),
+                (calls, call_text),
+                (self_time, f"{self_time:.4f}"),
+                (cumulative_time, f"{cumulative_time:.4f}"),
+            ], location)
+        self.functions_tree.setSortingEnabled(True)
+        self.functions_tree.sortByColumn(4, Qt.SortOrder.DescendingOrder)
+
+        self.allocations_tree.setSortingEnabled(False)
+        self.allocations_tree.clear()
+        allocations = []
+        if os.path.exists(stats_path + '.allocations'):
+            with open(stats_path + '.allocations') as file:
+                allocations = json.load(file)
+        for path, line, size, count in allocations:
+            location = (path, line) if os.path.isfile(path) else None
+            self.add_row(self.allocations_tree, [
+                (f"{os.path.basename(path)}:{line}", None),
+                (size, f"{size / 1024:.1f}"),
+                (count, str(count)),
+            ], location)
+        self.allocations_tree.setSortingEnabled(True)
+        self.allocations_tree.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+
+        self.tabs.setTabEnabled(1, bool(allocations))
+        self.tabs.setCurrentIndex(0)
+        self.status_label.setText(f"{os.path.basename(file_path)}: {len(stats)} functions, {total:.3f}s total"
+                                  + (f", {len(allocations)} allocation sites" if allocations else ""))
+
+    def open_location(self, item):
+        location = item.data(0, Qt.ItemDataRole.UserRole)
+        if location:
+            self.main_window.tab_widget.open_location(*location)
+
+class RunSession(QObject):
+    finished = Signal(object)
+
+    PROC_AVAILABLE = os.path.exists('/proc/self/stat')
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.widget = QPlainTextEdit()
+        self.widget.setReadOnly(True)
+        self.widget.setFont(QFont("Consolas", 10))
+        self.widget.setStyleSheet("background-color: #1E1E1E; color: #D4D4D4; border: 1px solid #3E3E3E;")
+        self.pump = OutputPump(self.widget)
+        self.process = None
+        self.warm_interpreter = None
+        self.run_id = None
+        self.pid = None
+        self.exit_code = None
+        self.started = time.monotonic()
+        self.ended = None
+        self.cpu_sample = None
+        self.cpu_percent = 0.0
+        self.rss = 0
+
+    def start(self, arguments=None, warm_interpreter=None, interpreter_arguments=None):
+        self.pump.write(f"--- Run {self.file_path} ---\n\n")
+        self.started = time.monotonic()
+        if warm_interpreter is not None:
+            self.warm_interpreter = warm_interpreter
+            warm_interpreter.run_started.connect(self.on_warm_started)
+            warm_interpreter.run_finished.connect(self.on_warm_finished)
+            self.run_id = warm_interpreter.run(self.file_path, self.pump)
+            return
+
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.MergedChannels)
+        self.process.setWorkingDirectory(os.path.dirname(os.path.abspath(self.file_path)))
+        self.process.readyReadStandardOutput.connect(self.read_output)
+        self.process.started.connect(lambda: setattr(self, 'pid', self.process.processId()))
+        self.process.finished.connect(self.on_process_finished)
+        self.process.errorOccurred.connect(self.on_process_error)
+        self.process.start(sys.executable, list(interpreter_arguments or []) + [self.file_path] + list(arguments or []))
+
+    def read_output(self):
+        self.pump.feed(self.process.readAllStandardOutput().data())
+
+    def on_process_finished(self, exit_code, exit_status):
+        self.read_output()
+        self.pump.finish()
+        self.on_finished(exit_code if exit_status == QProcess.ExitStatus.NormalExit else -1)
+
+    def on_process_error(self, error):
+        if error == QProcess.ProcessError.FailedToStart:
+            self.pump.write(f"Failed to start: {self.process.errorString()}\n")
+            self.on_finished(-1)
+
+    def on_warm_started(self, run_id, pid):
+        if run_id == self.run_id:
+            self.pid = pid
+
+    def on_warm_finished(self, run_id, exit_code):
+        if run_id == self.run_id:
+            self.warm_interpreter.run_started.disconnect(self.on_warm_started)
+            self.warm_interpreter.run_finished.disconnect(self.on_warm_finished)
+            self.on_finished(exit_code)
+
+    def on_finished(self, exit_code):
+        if self.exit_code is not None:
+            return
+        self.exit_code = exit_code
+        self.ended = time.monotonic()
+        self.pid = None
+        self.pump.write(f"\n--- Process finished with exit code {exit_code} in {self.wall_time():.2f}s ---\n")
+        log_manager.log('info', f'Run finished: {self.file_path} (exit code {exit_code}, {self.wall_time():.2f}s)')
+        self.finished.emit(self)
+
+    def is_running(self):
+        return self.exit_code is None
+
+    def wall_time(self):
+        return (self.ended or time.monotonic()) - self.started
+
+    def stop(self):
+        if not self.is_running():
+            return
+        if self.process is not None:
+            self.process.terminate()
+        elif self.warm_interpreter is not None:
+            self.warm_interpreter.kill(self.run_id, signal.SIGTERM)
+
+    def kill(self):
+        if not self.is_running():
+            return
+        if self.process is not None:
+            self.process.kill()
+        elif self.warm_interpreter is not None:
+            self.warm_interpreter.kill(self.run_id)
+
+    def sample(self):
+        if not self.PROC_AVAILABLE or not self.pid:
+            return
+        try:
+            with open(f'/proc/{self.pid}/stat') as file:
+                fields = file.read().rsplit(')', 1)[1].split()
+            with open(f'/proc/{self.pid}/statm') as file:
+                resident_pages = int(file.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return
+        ticks = int(fields[11]) + int(fields[12])
+        now = time.monotonic()
+        if self.cpu_sample is not None:
+            previous_ticks, previous_time = self.cpu_sample
+            elapsed = now - previous_time
+            if elapsed > 0:
+                self.cpu_percent = (ticks - previous_ticks) / os.sysconf('SC_CLK_TCK') / elapsed * 100
+        self.cpu_sample = (ticks, now)
+        self.rss = resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+    def describe(self):
+        name = os.path.basename(self.file_path)
+        if self.is_running():
+            pid = f"pid {self.pid}" if self.pid else "starting"
+            return (f"{name}: running, {pid}, CPU {self.cpu_percent:.0f}%, "
+                    f"RSS {self.rss / (1024 * 1024):.1f} MB, {self.wall_time():.1f}s")
+        return f"{name}: exited with code {self.exit_code} after {self.wall_time():.2f}s"
+
+class RunManager(QWidget):
+    SAMPLE_INTERVAL = 1000
+    MAX_FINISHED_RUNS = 10
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sessions = {}
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        controls = QHBoxLayout()
+        self.status_label = QLabel("No runs")
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.stop_current)
+        self.kill_button = QPushButton("Kill")
+        self.kill_button.clicked.connect(self.kill_current)
+        controls.addWidget(self.status_label, 1)
+        controls.addWidget(self.stop_button)
+        controls.addWidget(self.kill_button)
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.tabCloseRequested.connect(self.close_run)
+        self.tabs.currentChanged.connect(self.update_status)
+        layout.addLayout(controls)
+        layout.addWidget(self.tabs)
+
+        self.sample_timer = QTimer(self)
+        self.sample_timer.setInterval(self.SAMPLE_INTERVAL)
+        self.sample_timer.timeout.connect(self.sample)
+        self.update_status()
+
+    def start(self, file_path, arguments=None, warm_interpreter=None, interpreter_arguments=None):
+        session = RunSession(file_path, self)
+        session.finished.connect(self.on_finished)
+        self.sessions[session.widget] = session
+        index = self.tabs.addTab(session.widget, f"● {os.path.basename(file_path)}")
+        self.tabs.setTabToolTip(index, file_path)
+        self.tabs.setCurrentIndex(index)
+        session.start(arguments, warm_interpreter, interpreter_arguments)
+        if not self.sample_timer.isActive():
+            self.sample_timer.start()
+        self.prune_finished()
+        self.update_status()
+        return session
+
+    def current_session(self):
+        return self.sessions.get(self.tabs.currentWidget())
+
+    def running_sessions(self):
+        return [session for session in self.sessions.values() if session.is_running()]
+
+    def sample(self):
+        running = self.running_sessions()
+        if not running:
+            self.sample_timer.stop()
+        for session in running:
+            session.sample()
+        self.update_status()
+
+    def on_finished(self, session):
+        index = self.tabs.indexOf(session.widget)
+        if index >= 0:
+            self.tabs.setTabText(index, f"{os.path.basename(session.file_path)} ({session.exit_code})")
+        self.update_status()
+
+    def update_status(self, *args):
+        session = self.current_session()
+        self.status_label.setText(session.describe() if session else "No runs")
+        running = session is not None and session.is_running()
+        self.stop_button.setEnabled(running)
+        self.kill_button.setEnabled(running)
+
+    def prune_finished(self):
+        finished = [session for session in self.sessions.values() if not session.is_running()]
+        for session in finished[:max(0, len(finished) - self.MAX_FINISHED_RUNS)]:
+            self.close_run(self.tabs.indexOf(session.widget))
+
+    def close_run(self, index):
+        widget = self.tabs.widget(index)
+        session = self.sessions.pop(widget, None)
+        if session is None:
+            return
+        session.kill()
+        self.tabs.removeTab(index)
+        widget.deleteLater()
+        session.deleteLater()
+
+    def stop_current(self):
+        session = self.current_session()
+        if session:
+            session.stop()
+
+    def kill_current(self):
+        session = self.current_session()
+        if session:
+            session.kill()
+
+    def shutdown(self):
+        for session in self.running_sessions():
+            session.kill()
+            if session.process is not None:
+                session.process.waitForFinished(1000)
 
 class MainWindow(QMainWindow):
+    startup_finished = Signal()
+    FORMAT_ON_SAVE_TIMEOUT = 1000
+
     def __init__(self):
         super().__init__()
+        self.startup_scheduled = False
+        self.docks_created = False
         self.setWindowTitle("Faye IDE")
         self.setGeometry(100, 100, 1200, 800)
 
@@ -425,22 +4497,167 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
+        self.memory_label = QLabel()
+        self.status_bar.addPermanentWidget(self.memory_label)
+        self.memory_timer = QTimer(self)
+        self.memory_timer.setInterval(2000)
+        self.memory_timer.timeout.connect(self.update_memory_status)
+        self.memory_timer.start()
+        self.tab_widget.currentChanged.connect(self.update_memory_status)
+
+        self.file_io = self.tab_widget.file_io
+        self.file_io.save_finished.connect(self.on_file_saved)
+        self.file_io.save_failed.connect(self.on_file_save_failed)
+        self.pending_runs = {}
+        self.pending_test_ids = []
+        self.warm_interpreter = WarmInterpreter(parent=self)
+        self.formatter = Formatter(parent=self)
+        self.formatter.formatted.connect(self.on_formatted)
+        self.pending_formats = {}
+
+        self.workspace_root = os.getcwd()
+        self.test_runner = TestRunner(self.workspace_root, self)
+        self.run_tests_after_discovery = False
+        self.restore_session()
+        self.symbol_index = SymbolIndex(self.workspace_root, self)
+        self.path_index = PathIndex(self.workspace_root, self)
+        self.workspace_search = WorkspaceSearch(self.workspace_root, self)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.start_workspace_search)
+        self.search_request = None
 
-        self.create_output_dock()
-        
         self.create_menu()
         self.create_toolbar()
         self.set_dark_theme()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.startup_scheduled:
+            self.startup_scheduled = True
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        log_manager.start_file_logging()
+        self.ensure_docks()
+        self.symbol_index.start()
+        self.path_index.start()
+        CompletionService.instance().warm_up()
+        DiagnosticsService.instance().warm_up()
+        if self.format_on_save_action.isChecked():
+            self.formatter.start()
+        self.startup_finished.emit()
+
+    def ensure_docks(self):
+        if self.docks_created:
+            return
+        self.docks_created = True
+        self.create_output_dock()
+        self.create_problems_dock()
+        self.create_search_dock()
+        self.create_project_dock()
+        self.create_outline_dock()
+        self.create_tests_dock()
+        self.create_profile_dock()
         
     def create_output_dock(self):
-        self.output_widget = QPlainTextEdit()
-        self.output_widget.setReadOnly(True)
-        self.output_widget.setFont(QFont("Consolas", 10))
-        self.output_widget.setStyleSheet("background-color: #1E1E1E; color: #D4D4D4; border: 1px solid #3E3E3E;")
+        self.run_manager = RunManager(self)
         self.dock = QDockWidget("Terminal / Output", self)
-        self.dock.setWidget(self.output_widget)
+        self.dock.setWidget(self.run_manager)
         self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.dock)
 
+    def create_problems_dock(self):
+        self.problems_panel = ProblemsPanel(self)
+        self.problems_dock = QDockWidget("Problems", self)
+        self.problems_dock.setWidget(self.problems_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.problems_dock)
+        self.tabifyDockWidget(self.dock, self.problems_dock)
+        DiagnosticsService.instance().diagnostics_ready.connect(self.on_diagnostics_ready)
+        self.tab_widget.currentChanged.connect(self.update_problems)
+        self.update_problems()
+
+    def on_diagnostics_ready(self, editor, revision, diagnostics):
+        if editor is self.tab_widget.currentWidget() and revision == editor.document().revision():
+            self.problems_panel.show_diagnostics(editor, diagnostics)
+
+    def update_problems(self, *args):
+        editor = self.tab_widget.currentWidget()
+        if isinstance(editor, CodeEditor):
+            self.problems_panel.show_diagnostics(editor, editor.diagnostics)
+        else:
+            self.problems_panel.show_diagnostics(None, [])
+
+    def create_tests_dock(self):
+        self.test_panel = TestPanel(self)
+        self.tests_dock = QDockWidget("Tests", self)
+        self.tests_dock.setWidget(self.test_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.tests_dock)
+        self.tabifyDockWidget(self.dock, self.tests_dock)
+        self.test_runner.discovered.connect(self.on_tests_discovered)
+        self.test_runner.result_ready.connect(self.test_panel.add_result)
+        self.test_runner.run_finished.connect(self.test_panel.finish)
+
+    def create_outline_dock(self):
+        self.outline_panel = OutlinePanel(self)
+        self.outline_dock = QDockWidget("Outline", self)
+        self.outline_dock.setWidget(self.outline_panel)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.outline_dock)
+        OutlineService.instance().outline_ready.connect(self.on_outline_ready)
+        self.tab_widget.currentChanged.connect(self.update_outline)
+        self.update_outline()
+
+    def on_outline_ready(self, editor, revision, symbols):
+        if editor is self.tab_widget.currentWidget() and revision == editor.document().revision():
+            self.outline_panel.show_outline(editor, symbols)
+
+    def update_outline(self, *args):
+        editor = self.tab_widget.currentWidget()
+        if isinstance(editor, CodeEditor):
+            self.outline_panel.show_outline(editor, editor.outline)
+        else:
+            self.outline_panel.show_outline(None, [])
+
+    def create_project_dock(self):
+        self.project_model = QFileSystemModel(self)
+        self.project_model.setFilter(QDir.Filter.AllDirs | QDir.Filter.Files | QDir.Filter.NoDotAndDotDot)
+        self.project_model.setRootPath(self.workspace_root)
+        self.project_tree = QTreeView()
+        self.project_tree.setModel(self.project_model)
+        self.project_tree.setRootIndex(self.project_model.index(self.workspace_root))
+        self.project_tree.setHeaderHidden(True)
+        for column in range(1, self.project_model.columnCount()):
+            self.project_tree.hideColumn(column)
+        self.project_tree.activated.connect(self.open_project_item)
+        self.project_dock = QDockWidget("Project", self)
+        self.project_dock.setWidget(self.project_tree)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.project_dock)
+
+    def open_project_item(self, index):
+        if not self.project_model.isDir(index):
+            self.tab_widget.open_file(self.project_model.filePath(index))
+
+    def show_quick_open(self):
+        dialog = QuickOpenDialog(self, self.path_index)
+        dialog.show()
+
+    def create_search_dock(self):
+        self.search_panel = SearchResultsPanel(self)
+        self.workspace_search.results_found.connect(self.search_panel.add_results)
+        self.workspace_search.search_finished.connect(self.search_panel.finish)
+        self.search_dock = QDockWidget("Search results", self)
+        self.search_dock.setWidget(self.search_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.search_dock)
+        self.tabifyDockWidget(self.dock, self.search_dock)
+        self.dock.raise_()
+
+    def create_profile_dock(self):
+        self.profile_report = ProfileReport(self)
+        self.profile_dock = QDockWidget("Profiler", self)
+        self.profile_dock.setWidget(self.profile_report)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.profile_dock)
+        self.tabifyDockWidget(self.dock, self.profile_dock)
+
     def create_menu(self):
         menubar = self.menuBar()
         file_menu = menubar.addMenu("File")
@@ -466,6 +4683,25 @@ class MainWindow(QMainWindow):
         run_action = file_menu.addAction("Run")
         run_action.setShortcut("F5")
         run_action.triggered.connect(self.run_code)
+
+        profile_action = file_menu.addAction("Run with profiler")
+        profile_action.setShortcut("Ctrl+F5")
+        profile_action.triggered.connect(self.profile_code)
+
+        self.trace_memory_action = file_menu.addAction("Trace memory allocations")
+        self.trace_memory_action.setCheckable(True)
+
+        stop_run_action = file_menu.addAction("Stop run")
+        stop_run_action.setShortcut("Shift+F5")
+        stop_run_action.triggered.connect(self.stop_run)
+
+        self.fast_run_action = file_menu.addAction("Fast run (warm interpreter)")
+        self.fast_run_action.setCheckable(True)
+        self.fast_run_action.setEnabled(WarmInterpreter.is_supported())
+        self.fast_run_action.toggled.connect(self.toggle_fast_run)
+
+        save_output_action = file_menu.addAction("Save output log")
+        save_output_action.triggered.connect(self.save_output)
         
         file_menu.addSeparator()
         exit_action = file_menu.addAction("Exit")
@@ -501,6 +4737,52 @@ class MainWindow(QMainWindow):
         find_action = edit_menu.addAction("Find")
         find_action.setShortcut("Ctrl+F")
         find_action.triggered.connect(self.show_find_dialog)
+
+        find_in_files_action = edit_menu.addAction("Find in files")
+        find_in_files_action.setShortcut("Ctrl+Shift+F")
+        find_in_files_action.triggered.connect(lambda: self.show_find_dialog(in_workspace=True))
+
+        edit_menu.addSeparator()
+
+        format_action = edit_menu.addAction("Format document")
+        format_action.setShortcut("Shift+Alt+F")
+        format_action.triggered.connect(self.format_document)
+
+        self.format_on_save_action = edit_menu.addAction("Format on save")
+        self.format_on_save_action.setCheckable(True)
+        self.format_on_save_action.setChecked(os.environ.get('FAYE_IDE_FORMAT_ON_SAVE') == '1')
+        self.format_on_save_action.toggled.connect(self.toggle_format_on_save)
+
+        tests_menu = menubar.addMenu("Tests")
+
+        run_tests_action = tests_menu.addAction("Run all tests")
+        run_tests_action.setShortcut("F6")
+        run_tests_action.triggered.connect(self.run_all_tests)
+
+        run_test_at_cursor_action = tests_menu.addAction("Run test at cursor")
+        run_test_at_cursor_action.setShortcut("Ctrl+F6")
+        run_test_at_cursor_action.triggered.connect(self.run_test_at_cursor)
+
+        rerun_failed_action = tests_menu.addAction("Rerun failed tests")
+        rerun_failed_action.setShortcut("Shift+F6")
+        rerun_failed_action.triggered.connect(self.rerun_failed_tests)
+
+        stop_tests_action = tests_menu.addAction("Stop tests")
+        stop_tests_action.triggered.connect(self.stop_tests)
+
+        navigate_menu = menubar.addMenu("Navigate")
+
+        quick_open_action = navigate_menu.addAction("Quick open")
+        quick_open_action.setShortcut("Ctrl+P")
+        quick_open_action.triggered.connect(self.show_quick_open)
+
+        symbol_action = navigate_menu.addAction("Go to symbol")
+        symbol_action.setShortcut("Ctrl+T")
+        symbol_action.triggered.connect(self.show_symbol_search)
+
+        definition_action = navigate_menu.addAction("Go to definition")
+        definition_action.setShortcut("F12")
+        definition_action.triggered.connect(self.go_to_definition)
         
     def create_toolbar(self):
         toolbar = self.addToolBar("Main toolbar")
@@ -561,10 +4843,52 @@ class MainWindow(QMainWindow):
     def get_current_editor(self):
         return self.tab_widget.currentWidget()
         
-    def show_find_dialog(self):
+    def show_find_dialog(self, in_workspace=False):
         dialog = FindDialog(self)
+        if in_workspace:
+            dialog.workspace_check.setChecked(True)
         dialog.show()
+
+    def search_workspace(self, text, case_sensitive, whole_words, use_regex):
+        self.search_request = (text, case_sensitive, whole_words, use_regex)
+        self.workspace_search.cancel()
+        self.workspace_search.warm_up()
+        self.search_timer.start()
+
+    def start_workspace_search(self):
+        text, case_sensitive, whole_words, use_regex = self.search_request
+        try:
+            pattern = build_search_pattern(text, case_sensitive, whole_words, use_regex)
+        except re.error as e:
+            self.status_bar.showMessage(f"Invalid regular expression: {str(e)}")
+            return
+        self.ensure_docks()
+        search_id = self.workspace_search.start(pattern)
+        self.search_panel.begin(search_id, text)
+        self.search_dock.show()
+        self.search_dock.raise_()
         
+    def show_symbol_search(self):
+        editor = self.get_current_editor()
+        query = editor.symbol_under_cursor() if editor else ''
+        dialog = SymbolSearchDialog(self, self.symbol_index, query or '')
+        dialog.show()
+
+    def go_to_definition(self):
+        editor = self.get_current_editor()
+        name = editor.symbol_under_cursor() if editor else None
+        if not name:
+            return
+        current = os.path.abspath(editor.file_path) if editor.file_path else None
+        results = sorted(self.symbol_index.definitions(name), key=lambda result: result[2] != current)
+        if len(results) == 1:
+            _, _, path, line, column, _ = results[0]
+            self.tab_widget.open_location(path, line, column)
+        elif results:
+            SymbolSearchDialog(self, self.symbol_index, name, results).show()
+        else:
+            self.status_bar.showMessage(f"No definition found for '{name}'")
+
     def open_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Open file", "", "Python files (*.py);;Text files (*.txt);;All files (*.*)"
@@ -585,16 +4909,99 @@ class MainWindow(QMainWindow):
         editor = self.get_current_editor()
         if not editor: return False
         if not editor.file_path: return self.save_file_as()
-        try:
-            with open(editor.file_path, 'w', encoding='utf-8') as file:
-                file.write(editor.toPlainText())
-            self.status_bar.showMessage(f"File {editor.file_path} saved")
-            log_manager.log('info', f'Saved file: {editor.file_path}')
+        if (self.format_on_save_action.isChecked() and self.formatter.ready and not editor.large_file
+                and editor.file_path.endswith(('.py', '.pyw', '.pyi'))):
+            self.request_format(editor, save=True)
+            QTimer.singleShot(self.FORMAT_ON_SAVE_TIMEOUT, lambda: self.on_format_timeout(editor))
+            self.status_bar.showMessage(f"Formatting {editor.file_path}...")
             return True
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
-            log_manager.log('error', f'Error saving file {editor.file_path}: {str(e)}')
-            return False
+        self.write_editor(editor)
+        return True
+
+    def write_editor(self, editor):
+        editor.save_revision = editor.document().revision()
+        self.file_io.save(editor.file_path, editor.toPlainText())
+        self.status_bar.showMessage(f"Saving {editor.file_path}...")
+
+    def toggle_format_on_save(self, enabled):
+        if enabled:
+            self.formatter.start()
+
+    def format_document(self):
+        editor = self.get_current_editor()
+        if not editor or editor.isReadOnly() or editor.large_file: return
+        self.request_format(editor)
+        self.status_bar.showMessage("Formatting document...")
+
+    def request_format(self, editor, save=False):
+        token = object()
+        self.pending_formats[editor] = (token, save)
+        self.formatter.format(editor.toPlainText(), editor.file_path, (editor, editor.document().revision(), token))
+
+    def on_format_timeout(self, editor):
+        pending = self.pending_formats.get(editor)
+        if pending is None or not pending[1]:
+            return
+        del self.pending_formats[editor]
+        log_manager.log('warning', f'Formatting timed out, saving unformatted: {editor.file_path}')
+        if self.tab_widget.indexOf(editor) >= 0:
+            self.write_editor(editor)
+
+    def on_formatted(self, context, text, edits, error):
+        editor, revision, token = context
+        pending = self.pending_formats.get(editor)
+        if pending is None or pending[0] is not token:
+            return
+        del self.pending_formats[editor]
+        if self.tab_widget.indexOf(editor) < 0:
+            return
+        if error:
+            log_manager.log('warning', f'Formatting failed: {error}')
+            self.status_bar.showMessage(f"Formatting failed: {error.splitlines()[0]}")
+        elif editor.document().revision() != revision:
+            self.status_bar.showMessage("Document changed while formatting; formatting skipped")
+        elif edits:
+            scroll_bars = editor.verticalScrollBar(), editor.horizontalScrollBar()
+            positions = [scroll_bar.value() for scroll_bar in scroll_bars]
+            apply_text_edits(editor.document(), text, edits)
+            for scroll_bar, position in zip(scroll_bars, positions):
+                scroll_bar.setValue(position)
+            self.status_bar.showMessage(f"Formatted with {self.formatter.name}: {len(edits)} changed hunks")
+        else:
+            self.status_bar.showMessage("Document is already formatted")
+        if pending[1]:
+            self.write_editor(editor)
+
+    def on_file_saved(self, file_path):
+        if file_path not in self.file_io.pending_saves:
+            for index in range(self.tab_widget.count()):
+                editor = self.tab_widget.widget(index)
+                if (isinstance(editor, CodeEditor) and editor.file_path == file_path
+                        and editor.save_revision == editor.document().revision()):
+                    editor.document().setModified(False)
+        self.symbol_index.update_file(file_path)
+        self.status_bar.showMessage(f"File {file_path} saved")
+        log_manager.log('info', f'Saved file: {file_path}')
+        if file_path in self.pending_runs and file_path not in self.file_io.pending_saves:
+            mode = self.pending_runs.pop(file_path)
+            if mode == 'profile':
+                self.start_profile(file_path)
+            elif mode == 'tests':
+                if 'tests' not in self.pending_runs.values():
+                    self.start_tests(self.pending_test_ids)
+            else:
+                self.start_process(file_path)
+
+    def on_file_save_failed(self, file_path, error):
+        if self.pending_runs.pop(file_path, None) == 'tests':
+            self.pending_runs = {path: mode for path, mode in self.pending_runs.items() if mode != 'tests'}
+            self.test_panel.status_label.setText("Tests not run: save failed")
+        for index in range(self.tab_widget.count()):
+            editor = self.tab_widget.widget(index)
+            if editor.file_path == file_path and isinstance(editor, CodeEditor):
+                editor.document().setModified(True)
+        QMessageBox.critical(self, "Error", f"Failed to save file: {error}")
+        log_manager.log('error', f'Error saving file {file_path}: {error}')
             
     def save_file_as(self):
         editor = self.get_current_editor()
@@ -610,6 +5017,12 @@ class MainWindow(QMainWindow):
         return False
 
     def run_code(self):
+        self.queue_run('run')
+
+    def profile_code(self):
+        self.queue_run('profile')
+
+    def queue_run(self, mode):
         editor = self.get_current_editor()
         if not editor: return
         
@@ -617,25 +5030,249 @@ class MainWindow(QMainWindow):
             if not self.save_file_as(): return
         else:
             if not self.save_file(): return
-            
-        self.output_widget.clear()
-        self.output_widget.appendPlainText(f"--- Run {editor.file_path} ---\n")
-        
-        self.process = QProcess(self)
-        self.process.setProcessChannelMode(QProcess.MergedChannels)
-        self.process.readyReadStandardOutput.connect(self.handle_output)
-        
-        log_manager.log('info', f'Run code: {editor.file_path}')
-        self.process.start(sys.executable, [editor.file_path])
-        
-    def handle_output(self):
-        data = self.process.readAllStandardOutput()
-        text = data.data().decode('utf-8')
-        self.output_widget.appendPlainText(text)
+        self.pending_runs[editor.file_path] = mode
+
+    def run_all_tests(self):
+        self.ensure_docks()
+        self.run_tests_after_discovery = True
+        self.test_panel.status_label.setText("Discovering tests...")
+        self.test_runner.discover()
+
+    def on_tests_discovered(self, tests):
+        self.test_runner.tests = tests
+        self.test_panel.show_tests(tests)
+        if self.run_tests_after_discovery:
+            self.run_tests_after_discovery = False
+            self.run_tests(select_tests(tests, {test_id.split('::', 1)[0] for test_id, line, end_line in tests}))
+
+    def run_test_at_cursor(self):
+        editor = self.get_current_editor()
+        if not isinstance(editor, CodeEditor) or not editor.file_path: return
+        relative_path = os.path.relpath(os.path.abspath(editor.file_path), self.workspace_root).replace(os.sep, '/')
+        tests = discover_tests(editor.toPlainText(), relative_path)
+        line = editor.textCursor().blockNumber() + 1
+        enclosing = [test_id for test_id, start, end in tests if start <= line <= end]
+        test_ids = select_tests(tests, enclosing[-1:] or ([relative_path] if is_test_file(relative_path) else []))
+        if not test_ids:
+            self.status_bar.showMessage("No test at cursor")
+            return
+        self.run_tests(test_ids)
+
+    def rerun_failed_tests(self):
+        self.ensure_docks()
+        failed = self.test_panel.failed_ids()
+        if not failed:
+            self.status_bar.showMessage("No failed tests to rerun")
+            return
+        self.run_tests(list(chain.from_iterable(select_tests(self.test_runner.tests, [test_id]) or [test_id]
+                                                for test_id in failed)))
+
+    def run_tests(self, test_ids):
+        self.ensure_docks()
+        if not test_ids:
+            self.test_panel.status_label.setText("No tests found")
+            return
+        self.pending_test_ids = test_ids
+        for index in range(self.tab_widget.count()):
+            editor = self.tab_widget.widget(index)
+            if (isinstance(editor, CodeEditor) and editor.file_path and not editor.isReadOnly()
+                    and editor.document().isModified()):
+                self.write_editor(editor)
+                self.pending_runs[editor.file_path] = 'tests'
+        if 'tests' in self.pending_runs.values():
+            self.test_panel.status_label.setText("Saving files before running tests...")
+        else:
+            self.start_tests(test_ids)
+
+    def start_tests(self, test_ids):
+        self.test_panel.begin(test_ids)
+        self.test_runner.run(test_ids, self.test_panel.workers_spin.value())
+        self.tests_dock.raise_()
+
+    def stop_tests(self):
+        if self.test_runner.is_running():
+            self.test_runner.stop()
+            self.test_panel.update_status("stopped")
+
+    def toggle_fast_run(self, enabled):
+        if enabled:
+            self.warm_interpreter.start()
+        else:
+            self.warm_interpreter.stop()
+
+    def start_process(self, file_path):
+        warm_interpreter = None
+        if self.fast_run_action.isChecked() and self.warm_interpreter.ready:
+            warm_interpreter = self.warm_interpreter
+            log_manager.log('info', f'Run code (warm): {file_path}')
+        else:
+            log_manager.log('info', f'Run code: {file_path}')
+        self.ensure_docks()
+        self.run_manager.start(file_path, warm_interpreter=warm_interpreter)
+        self.dock.raise_()
+
+    def start_profile(self, file_path):
+        handle, stats_path = tempfile.mkstemp(prefix='faye-ide-', suffix='.prof')
+        os.close(handle)
+        trace_memory = '1' if self.trace_memory_action.isChecked() else '0'
+        log_manager.log('info', f'Profile code: {file_path}')
+        self.ensure_docks()
+        session = self.run_manager.start(file_path,
+                                         interpreter_arguments=['-c', PROFILE_RUNNER_SOURCE, stats_path, trace_memory])
+        session.finished.connect(lambda session: self.on_profile_finished(session, stats_path))
+        self.dock.raise_()
+
+    def on_profile_finished(self, session, stats_path):
+        try:
+            if os.path.getsize(stats_path):
+                self.profile_report.load(session.file_path, stats_path)
+                self.profile_dock.raise_()
+            else:
+                self.status_bar.showMessage(f"No profile data for {session.file_path}")
+        except Exception as e:
+            log_manager.log('error', f'Error loading profile {stats_path}: {str(e)}')
+            self.status_bar.showMessage(f"Failed to load profile: {str(e)}")
+        finally:
+            for path in (stats_path, stats_path + '.allocations'):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def stop_run(self):
+        if self.docks_created:
+            self.run_manager.stop_current()
+
+    def save_output(self):
+        session = self.run_manager.current_session() if self.docks_created else None
+        if not session:
+            self.status_bar.showMessage("No output to save")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Save output log", "", "Log files (*.log);;Text files (*.txt);;All files (*.*)"
+        )
+        if file_path:
+            try:
+                session.pump.save_to(file_path)
+                self.status_bar.showMessage(f"Output saved to {file_path}")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to save output: {str(e)}")
+                log_manager.log('error', f'Error saving output {file_path}: {str(e)}')
+
+    def update_memory_status(self, *args):
+        editor = self.get_current_editor()
+        if editor is None:
+            return
+        megabyte = 1024 * 1024
+        widgets = [self.tab_widget.widget(index) for index in range(self.tab_widget.count())]
+        hibernated = sum(isinstance(widget, PlaceholderTab) for widget in widgets)
+        self.memory_label.setText(f"Tab ~{editor.memory_estimate() / megabyte:.1f} MB | "
+                                  f"All tabs ~{self.tab_widget.memory_estimate() / megabyte:.1f} MB, "
+                                  f"{hibernated} hibernated")
+
+    def session_path(self):
+        digest = hashlib.sha1(os.path.abspath(self.workspace_root).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(os.path.expanduser('~'), '.faye_ide', 'sessions', f'{digest}.json')
+
+    def restore_session(self):
+        try:
+            with open(self.session_path(), 'r', encoding='utf-8') as file:
+                session = json.load(file)
+        except (OSError, ValueError):
+            session = {}
+        if not isinstance(session, dict):
+            session = {}
+        tabs = session.get('tabs')
+
+        self.tab_widget.blockSignals(True)
+        for tab in tabs if isinstance(tabs, list) else []:
+            if not isinstance(tab, dict):
+                continue
+            path, line, column, scroll = tab.get('path'), tab.get('line', 1), tab.get('column', 0), tab.get('scroll', 0)
+            if not isinstance(path, str) or not all(isinstance(value, int) for value in (line, column, scroll)):
+                log_manager.log('warning', f'Skipping invalid session entry: {tab!r}')
+            elif os.path.isfile(path):
+                self.tab_widget.add_placeholder(path, line, column, scroll)
+        self.tab_widget.blockSignals(False)
+
+        if self.tab_widget.count() == 0:
+            self.tab_widget.create_new_tab()
+            return
+        current = self.tab_widget.find_editor(session['current']) if isinstance(session.get('current'), str) else None
+        if current is None:
+            self.tab_widget.materialize(0)
+        else:
+            self.tab_widget.setCurrentWidget(current)
+        log_manager.log('info', f'Session restored: {self.tab_widget.count()} tabs')
+
+    def save_session(self):
+        tabs = []
+        for index in range(self.tab_widget.count()):
+            widget = self.tab_widget.widget(index)
+            if widget.file_path:
+                line, column, scroll = widget.view_state()
+                tabs.append({'path': os.path.abspath(widget.file_path), 'line': line, 'column': column, 'scroll': scroll})
+        current = self.get_current_editor()
+        session = {'tabs': tabs, 'current': os.path.abspath(current.file_path) if current and current.file_path else None}
+        try:
+            os.makedirs(os.path.dirname(self.session_path()), exist_ok=True)
+            FileIO.write_atomic(self.session_path(), json.dumps(session, indent=1))
+        except OSError as e:
+            log_manager.log('error', f'Error saving session: {str(e)}')
+
+    def closeEvent(self, event):
+        self.save_session()
+        if self.docks_created:
+            self.run_manager.shutdown()
+        self.warm_interpreter.stop()
+        self.formatter.stop()
+        self.test_runner.stop()
+        self.workspace_search.shutdown()
+        DiagnosticsService.instance().shutdown()
+        SearchIndex.shutdown()
+        self.file_io.wait_for_done()
+        super().closeEvent(event)
+
+class StartupProfiler(QObject):
+    def __init__(self, started):
+        super().__init__()
+        self.last = started
+        self.started = started
+        self.phases = []
+        self.painted = False
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and not self.painted:
+            self.painted = True
+            QTimer.singleShot(0, lambda: self.mark('first paint'))
+        return False
+
+    def report(self):
+        QApplication.instance().removeEventFilter(self)
+        self.mark('deferred startup')
+        print("Startup profile:", file=sys.stderr)
+        for phase, elapsed in self.phases:
+            print(f"  {phase:<18} {elapsed * 1000:8.1f} ms", file=sys.stderr)
+        print(f"  {'total':<18} {(self.last - self.started) * 1000:8.1f} ms", file=sys.stderr)
 
 def main():
+    profiler = None
+    if '--profile-startup' in sys.argv:
+        sys.argv.remove('--profile-startup')
+        profiler = StartupProfiler(STARTUP_STARTED)
+        profiler.mark('imports')
+
     app = QApplication(sys.argv)
+    if profiler:
+        profiler.mark('QApplication')
+        app.installEventFilter(profiler)
     window = MainWindow()
+    if profiler:
+        profiler.mark('window build')
+        window.startup_finished.connect(profiler.report)
     window.show()
     sys.exit(app.exec())
 
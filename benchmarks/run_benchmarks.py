@@ -0,0 +1,421 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IDE_PATH = os.path.join(REPO_ROOT, 'FayeIDE.py')
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+WAIT_TIMEOUT = 600.0
+SEARCH_TEXT = 'value'
+REPLACE_TEXT = 'amount'
+
+TEMPLATE = [
+    'class Widget{n}(object):',
+    '    """Synthetic class {n} used by the benchmarks."""',
+    '',
+    '    def __init__(self, value={n}, name="widget_{n}"):',
+    '        self.value = value  # initial value',
+    "        self.name = name + '_' + str(value)",
+    '        self.items = [value, value * 2, value ** 2]',
+    '',
+    '    @property',
+    '    def total(self):',
+    '        return sum(self.items) + len(self.name) if self.items else None',
+    '',
+    '    def describe(self, prefix=r"\\d+", *args, **kwargs):',
+    '        text = f"{prefix}: {self.value} {self.name!r}"',
+    '        for index, item in enumerate(self.items):',
+    '            if isinstance(item, int) and item % 3 == 0:',
+    "                text += '\\n' + hex(item)",
+    '        return text',
+    '',
+    '',
+]
+
+FLOOD_SOURCE = """
+import sys
+write = sys.stdout.write
+for number in range({lines}):
+    write(f"line {{number}}: the quick brown fox jumps over the lazy dog\\n")
+"""
+
+
+def synthetic_source(lines):
+    result = []
+    block = 0
+    while len(result) < lines:
+        result.extend(line.replace('{n}', str(block)) for line in TEMPLATE)
+        block += 1
+    return '\n'.join(result[:lines]) + '\n'
+
+
+def output_lines(lines):
+    return ''.join(f"line {number}: the quick brown fox jumps over the lazy dog\n" for number in range(lines))
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Suite:
+    def __init__(self, sizes, repeat, selected, work_dir):
+        self.sizes = sizes
+        self.repeat = repeat
+        self.selected = selected
+        self.work_dir = work_dir
+        self.data_dir = os.path.join(work_dir, 'data')
+        self.workspace_dir = os.path.join(work_dir, 'workspace')
+        os.makedirs(self.data_dir)
+        os.makedirs(self.workspace_dir)
+        self.sources = {}
+        self.results = []
+        self.window = None
+
+    def source(self, lines):
+        if lines not in self.sources:
+            self.sources[lines] = synthetic_source(lines)
+        return self.sources[lines]
+
+    def source_file(self, lines):
+        file_path = os.path.join(self.data_dir, f'synthetic_{lines}.py')
+        if not os.path.exists(file_path):
+            with open(file_path, 'w', encoding='utf-8') as file:
+                file.write(self.source(lines))
+        return file_path
+
+    def wanted(self, name):
+        return not self.selected or any(pattern in name for pattern in self.selected)
+
+    def measure(self, name, lines, sample):
+        if not self.wanted(name):
+            return
+        print(f"{name} [{lines} lines]...", file=sys.stderr, end=' ', flush=True)
+        samples = [sample() for _ in range(self.repeat)]
+        seconds = [entry['seconds'] for entry in samples]
+        result = {
+            'name': name,
+            'lines': lines,
+            'median': statistics.median(seconds),
+            'min': min(seconds),
+            'samples': seconds,
+        }
+        if result['median'] > 0:
+            result['lines_per_second'] = lines / result['median']
+        for key in samples[0]:
+            if key != 'seconds':
+                result[key] = statistics.median(entry[key] for entry in samples)
+        self.results.append(result)
+        print(f"{result['median'] * 1000:.1f} ms", file=sys.stderr)
+
+    def wait_until(self, condition, timeout=WAIT_TIMEOUT):
+        from PySide6.QtCore import QEventLoop, QTimer
+        if condition():
+            return
+        loop = QEventLoop()
+        deadline = time.perf_counter() + timeout
+        timer = QTimer()
+        timer.setInterval(1)
+
+        def check():
+            if condition():
+                loop.exit(0)
+            elif time.perf_counter() > deadline:
+                loop.exit(1)
+
+        timer.timeout.connect(check)
+        timer.start()
+        failed = loop.exec()
+        timer.stop()
+        if failed:
+            raise TimeoutError("Benchmark condition was not reached in time")
+
+    def settle(self):
+        from PySide6.QtWidgets import QApplication
+        for _ in range(3):
+            QApplication.processEvents()
+
+    def main_window(self):
+        import FayeIDE
+        if self.window is None:
+            self.window = FayeIDE.MainWindow()
+            self.window.resize(1200, 800)
+            self.window.show()
+            finished = []
+            self.window.startup_finished.connect(lambda: finished.append(True))
+            self.wait_until(lambda: finished)
+        return self.window
+
+    def scratch_editor(self, text):
+        tab_widget = self.main_window().tab_widget
+        editor = tab_widget.create_new_tab()
+        editor.setPlainText(text)
+        self.settle()
+        return editor
+
+    def close_editor(self, editor):
+        tab_widget = self.main_window().tab_widget
+        tab_widget.close_tab(tab_widget.indexOf(editor))
+        editor.deleteLater()
+        self.settle()
+
+    def run(self):
+        self.bench_highlighter()
+        self.bench_open_file()
+        self.bench_find()
+        self.bench_output()
+        self.bench_startup()
+        return self.results
+
+    def bench_highlighter(self):
+        import FayeIDE
+        from PySide6.QtGui import QTextDocument
+
+        for engine in FayeIDE.PythonHighlighter.ENGINES:
+            for lines in self.sizes:
+                document = QTextDocument()
+                document.setPlainText(self.source(lines))
+                highlighter = FayeIDE.PythonHighlighter(document, engine, lazy=False)
+
+                def sample():
+                    started = time.perf_counter()
+                    highlighter.rehighlight()
+                    return {'seconds': time.perf_counter() - started}
+
+                self.measure(f'highlight/{engine}', lines, sample)
+                highlighter.setDocument(None)
+
+    def bench_open_file(self):
+        for lines in self.sizes:
+            if not self.wanted('open_file'):
+                return
+            file_path = self.source_file(lines)
+
+            def sample():
+                tab_widget = self.main_window().tab_widget
+                started = time.perf_counter()
+                editor = tab_widget.create_new_tab(file_path)
+                self.wait_until(lambda: editor.document().characterCount() > 1)
+                first_content = time.perf_counter() - started
+                self.wait_until(lambda: editor.loader is None and not editor.isReadOnly())
+                elapsed = time.perf_counter() - started
+                self.close_editor(editor)
+                return {'seconds': elapsed, 'first_content': first_content}
+
+            self.measure('open_file', lines, sample)
+
+    def bench_find(self):
+        import FayeIDE
+
+        information = FayeIDE.QMessageBox.information
+        FayeIDE.QMessageBox.information = staticmethod(lambda *args, **kwargs: None)
+        try:
+            for lines in self.sizes:
+                if not (self.wanted('find/') or self.wanted('replace_all')):
+                    return
+                text = self.source(lines)
+                editor = self.scratch_editor(text)
+                dialog = FayeIDE.FindDialog(self.main_window())
+                dialog.find_input.setText(SEARCH_TEXT)
+                dialog.replace_input.setText(REPLACE_TEXT)
+                dialog.highlight_timer.stop()
+
+                def highlight_sample():
+                    dialog.count_key = None
+                    started = time.perf_counter()
+                    dialog.highlight_matches(SEARCH_TEXT)
+                    visible = time.perf_counter() - started
+                    self.wait_until(lambda: dialog.count_label.text().endswith("matches"))
+                    return {'seconds': visible, 'count_seconds': time.perf_counter() - started}
+
+                def replace_sample():
+                    editor.setPlainText(text)
+                    self.settle()
+                    started = time.perf_counter()
+                    dialog.replace_all_text()
+                    elapsed = time.perf_counter() - started
+                    self.settle()
+                    return {'seconds': elapsed}
+
+                self.measure('find/highlight_matches', lines, highlight_sample)
+                self.measure('replace_all', lines, replace_sample)
+                dialog.close()
+                self.close_editor(editor)
+        finally:
+            FayeIDE.QMessageBox.information = information
+
+    def bench_output(self):
+        import FayeIDE
+        from PySide6.QtCore import QTimer
+        from PySide6.QtWidgets import QPlainTextEdit
+
+        for lines in self.sizes:
+            data = output_lines(lines).encode('utf-8')
+
+            def feed_sample():
+                widget = QPlainTextEdit()
+                pump = FayeIDE.OutputPump(widget)
+                started = time.perf_counter()
+                for offset in range(0, len(data), 65536):
+                    pump.feed(data[offset:offset + 65536])
+                pump.finish()
+                elapsed = time.perf_counter() - started
+                widget.deleteLater()
+                return {'seconds': elapsed}
+
+            self.measure('output/feed', lines, feed_sample)
+
+            if not self.wanted('output/flood'):
+                continue
+            script_path = os.path.join(self.data_dir, f'flood_{lines}.py')
+            with open(script_path, 'w', encoding='utf-8') as file:
+                file.write(FLOOD_SOURCE.format(lines=lines))
+
+            def flood_sample():
+                session = FayeIDE.RunSession(script_path)
+                finished = []
+                session.finished.connect(lambda *args: finished.append(True))
+                stalls = [0.0]
+                last_tick = [time.perf_counter()]
+
+                def tick():
+                    now = time.perf_counter()
+                    stalls[0] = max(stalls[0], now - last_tick[0])
+                    last_tick[0] = now
+
+                probe = QTimer()
+                probe.setInterval(5)
+                probe.timeout.connect(tick)
+                started = time.perf_counter()
+                probe.start()
+                session.start()
+                self.wait_until(lambda: finished and not session.pump.pending)
+                elapsed = time.perf_counter() - started
+                probe.stop()
+                session.pump.timer.stop()
+                session.widget.deleteLater()
+                session.deleteLater()
+                self.settle()
+                return {'seconds': elapsed, 'max_stall': stalls[0]}
+
+            self.measure('output/flood', lines, flood_sample)
+
+    def bench_startup(self):
+        environment = dict(os.environ, QT_QPA_PLATFORM='offscreen', HOME=self.work_dir)
+
+        def sample():
+            started = time.perf_counter()
+            process = subprocess.Popen([sys.executable, IDE_PATH, '--profile-startup'],
+                                       cwd=self.workspace_dir, env=environment,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            phases = {}
+            try:
+                for line in process.stderr:
+                    parts = line.rsplit(None, 2)
+                    if len(parts) == 3 and parts[2] == 'ms' and line.startswith('  '):
+                        phases[parts[0].strip()] = float(parts[1]) / 1000
+                        if parts[0].strip() == 'total':
+                            break
+                elapsed = time.perf_counter() - started
+            finally:
+                process.kill()
+                process.wait()
+            if 'total' not in phases:
+                raise RuntimeError("FayeIDE did not report a startup profile")
+            phases.pop('total')
+            first_paint = sum(seconds for phase, seconds in phases.items() if phase != 'deferred startup')
+            result = {'seconds': first_paint, 'process_seconds': elapsed}
+            result.update((phase.replace(' ', '_'), seconds) for phase, seconds in phases.items())
+            return result
+
+        self.measure('startup/first_paint', 0, sample)
+
+
+def compare(results, baseline, threshold):
+    previous = {(entry['name'], entry['lines']): entry for entry in baseline['results']}
+    regressions = []
+    print(f"{'benchmark':<28} {'lines':>8} {'baseline':>11} {'current':>11} {'ratio':>7}")
+    for entry in results:
+        old = previous.get((entry['name'], entry['lines']))
+        if not old or not old['median']:
+            continue
+        ratio = entry['median'] / old['median']
+        marker = ''
+        if ratio > 1 + threshold:
+            marker = '  REGRESSION'
+            regressions.append(entry)
+        print(f"{entry['name']:<28} {entry['lines']:>8} {old['median'] * 1000:>9.1f}ms "
+              f"{entry['median'] * 1000:>9.1f}ms {ratio:>7.2f}{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for FayeIDE editor hot paths")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated synthetic file sizes in lines")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--only', action='append', default=[],
+                        help="run only benchmarks whose name contains this text (repeatable)")
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--compare', help="JSON results of a previous run to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown ratio before a benchmark counts as a regression")
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    work_dir = tempfile.mkdtemp(prefix='faye-ide-bench-')
+    os.environ['HOME'] = work_dir
+    suite = Suite([int(size) for size in args.sizes.split(',') if size], args.repeat, args.only, work_dir)
+    os.chdir(suite.workspace_dir)
+    sys.path.insert(0, REPO_ROOT)
+    try:
+        from PySide6.QtCore import __version__ as pyside_version, qVersion
+        from PySide6.QtWidgets import QApplication
+        app = QApplication([sys.argv[0]])
+        results = suite.run()
+        report = {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pyside': pyside_version,
+            'qt': qVersion(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'results': results,
+        }
+        if suite.window is not None:
+            suite.window.close()
+        app.processEvents()
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+import FayeIDE
+
+
+@pytest.fixture(scope='session')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(app, tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    window = FayeIDE.MainWindow()
+    yield window
+    window.tab_widget.reload_timer.stop()
+    window.deleteLater()
+
+
+def test_untitled_tab_survives_hibernation(window, app):
+    tab_widget = window.tab_widget
+    untitled = tab_widget.create_new_tab()
+    untitled.setPlainText('x = 1\n')
+    other = tab_widget.create_new_tab()
+    tab_widget.setCurrentWidget(other)
+    index = tab_widget.indexOf(untitled)
+    tab_widget.hibernate(index)
+    assert isinstance(tab_widget.widget(index), FayeIDE.PlaceholderTab)
+
+    tab_widget.setCurrentIndex(index)
+    app.processEvents()
+
+    editor = tab_widget.widget(index)
+    assert isinstance(editor, FayeIDE.CodeEditor)
+    assert editor.file_path is None
+    assert editor.toPlainText() == 'x = 1\n'
+    assert not any(isinstance(tab_widget.widget(i), FayeIDE.PlaceholderTab) for i in range(tab_widget.count()))
+
+
+def test_write_atomic_creates_files_with_default_mode(tmp_path):
+    file_path = tmp_path / 'new.py'
+    FayeIDE.FileIO.write_atomic(str(file_path), 'x = 1\n')
+    assert file_path.read_text() == 'x = 1\n'
+    assert file_path.stat().st_mode & 0o777 == 0o666 & ~FayeIDE.current_umask()
+
+
+def test_write_atomic_keeps_existing_mode(tmp_path):
+    file_path = tmp_path / 'script.py'
+    file_path.write_text('old\n')
+    file_path.chmod(0o755)
+    FayeIDE.FileIO.write_atomic(str(file_path), 'new\n')
+    assert file_path.read_text() == 'new\n'
+    assert file_path.stat().st_mode & 0o777 == 0o755
+
+
+def test_except_as_binds_name():
+    source = 'try:\n    pass\nexcept ValueError as error:\n    print(error, missing)\n'
+    assert FayeIDE.analyze_source(source) == [(4, 17, 24, 'error', "undefined name 'missing'")]
+
+
+def test_run_tests_waits_for_pending_saves(window, app, tmp_path, monkeypatch):
+    started = []
+    monkeypatch.setattr(window, 'start_tests', started.append)
+    file_path = tmp_path / 'test_sample.py'
+    editor = window.tab_widget.create_new_tab()
+    editor.file_path = str(file_path)
+    editor.setPlainText('def test_sample():\n    pass\n')
+    editor.document().setModified(True)
+
+    window.run_tests(['test_sample.py::test_sample'])
+    assert started == []
+    assert window.pending_runs == {str(file_path): 'tests'}
+
+    window.file_io.pool.waitForDone()
+    app.processEvents()
+
+    assert started == [['test_sample.py::test_sample']]
+    assert window.pending_runs == {}
+    assert file_path.read_text() == 'def test_sample():\n    pass\n'
+
+
+def test_ensure_docks_creates_profile_dock(window):
+    window.ensure_docks()
+    assert window.profile_dock.widget() is window.profile_report
+    assert window.profile_dock in window.tabifiedDockWidgets(window.dock)
+
+
+def test_path_index_rescan_walks_new_directories_off_thread(app, tmp_path):
+    (tmp_path / 'main.py').write_text('')
+    path_index = FayeIDE.PathIndex(str(tmp_path))
+    path_index.build()
+    assert path_index.search('main') == ['main.py']
+
+    (tmp_path / 'package' / 'nested').mkdir(parents=True)
+    (tmp_path / 'package' / 'nested' / 'module.py').write_text('')
+    (tmp_path / 'main.py').unlink()
+    path_index.changed_directories.add('')
+    path_index.rescan()
+    assert path_index.rescanning
+
+    path_index.pool.waitForDone()
+    app.processEvents()
+
+    assert not path_index.rescanning
+    assert path_index.search('module') == ['package/nested/module.py']
+    assert path_index.search('main') == []
+    assert 'package/nested' in path_index.directories
+
+
+def test_match_counter_stops_between_chunks():
+    counter = FayeIDE.MatchCounter()
+    ready = []
+    counter.count_ready.connect(lambda token, starts: ready.append(starts))
+    token = FayeIDE.threading.Event()
+    chunks = iter([(0, 'x = 1\n'), (6, 'x = 2\n')])
+
+    def cancelling_chunks():
+        yield next(chunks)
+        token.set()
+        yield next(chunks)
+
+    counter.count(token, FayeIDE.re.compile('x'), cancelling_chunks())
+    assert ready == []
+
+    token = FayeIDE.threading.Event()
+    counter.count(token, FayeIDE.re.compile('x'), [(0, 'x = 1\n'), (6, 'x = 2\n')])
+    assert list(ready[0]) == [0, 6]